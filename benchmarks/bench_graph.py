@@ -0,0 +1,301 @@
+"""
+Headless benchmarks of the graph package hot paths.
+
+Runs a ScatterPlot with its tables under the offscreen Qt platform and
+times trace generation, near lookups, style switches, selection creation
+and splitting and table fills, for total point counts from 10^3 to 10^7.
+Results are written as JSON, and a previous result file can be given to
+flag regressions.
+
+Usage:
+    python benchmarks/bench_graph.py --sizes 1e3 1e5 1e7 --out results.json
+    python benchmarks/bench_graph.py --compare baseline.json --threshold 1.25
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pyqtgraph
+from PyQt6.QtCore import QPointF, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+from graph.graph_page import GraphWindow
+from graph.plot_widget import gen_data
+
+DURATION = 3600.0
+
+
+def wait(app, plot):
+    """Processes events until every worker job reported back, then runs the coalesced updates."""
+    while plot.workers.pending():
+        app.processEvents()
+    app.processEvents()
+    plot.coalescer.flush()
+
+
+def measure(fn, repeat, setup=None):
+    """
+    Times a function.
+
+    Args:
+        fn: Function to time, called without arguments.
+        repeat (int): Number of runs.
+        setup: Untimed function called before every run (optional).
+
+    Returns:
+        dict: Minimum, median and mean seconds and the run count.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"repeat": repeat, "min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times)}
+
+
+class Bench:
+    """The main window, its plot and tables and the loaded traces for one data size."""
+
+    def __init__(self, app, size, traces, seed):
+        """
+        Builds the widgets and loads the traces.
+
+        Args:
+            app (QApplication): The application.
+            size (int): Total number of points over all traces.
+            traces (int): Number of traces.
+            seed (int): Seed for the generated data.
+        """
+        self.app = app
+        self.size = size
+        self.traces = traces
+        self.seed = seed
+        self.window = GraphWindow()
+        self.window.resize(1600, 1000)
+        self.window.show()
+        self.plot = self.window.plot
+        self.selections = self.window.selections
+        self.time_table = self.window.time_selections
+        self.roi_table = self.window.roi_table
+        self.near_table = self.window.near_table
+        wait(app, self.plot)
+        self.generate()
+
+    def generate(self):
+        """Generates and plots every trace, waiting for the workers."""
+        plot = self.plot
+        plot.set_store(type(plot.store)(), [])
+        plot.demo(self.traces, self.size / self.traces / DURATION, DURATION, self.seed)
+        wait(self.app, plot)
+        plot.autoRange()
+        self.app.processEvents()
+
+    def gen_data(self):
+        """Generates one trace holding every point."""
+        gen_data(self.seed, self.size / DURATION, DURATION)
+
+    def plot_data(self):
+        """Derives and adds one trace holding every point."""
+        self.plot.plot_data(len(self.plot.store), gen_data(self.seed, self.size / DURATION, DURATION))
+        wait(self.app, self.plot)
+
+    def near(self):
+        """Looks up the points near the middle of the view and fills the near table."""
+        (xlo, xhi), (ylo, yhi) = self.plot.getViewBox().viewRange()
+        point = QPointF((xlo + xhi) / 2, ylo + (yhi - ylo) / 10)
+        self.plot.get_coords = lambda: point
+        self.plot.near_mouse_table()
+        wait(self.app, self.plot)
+
+    def style_switch(self):
+        """Switches to contrast mode and back."""
+        self.plot.contrast_mode()
+        self.app.processEvents()
+        self.plot.color_mode()
+        self.app.processEvents()
+
+    def span(self, a, b):
+        lo, hi = self.plot.getViewBox().viewRange()[0]
+        return lo + (hi - lo) * a, lo + (hi - lo) * b
+
+    def selections_with_rois(self, count):
+        """Creates time selections with one ROI each, one at a time."""
+        plot = self.plot
+        for n in range(count):
+            trid = plot.time_region_next_id
+            plot._time_selection(*self.span(n / count, (n + 0.5) / count))
+            plot._roi(0.6, 0.2, trid, plot.time_regions[trid].region)
+        self.app.processEvents()
+
+    def split(self):
+        """Splits a selection with an ROI."""
+        plot = self.plot
+        trid = plot.time_region_next_id
+        plot._time_selection(*self.span(0.25, 0.75))
+        plot._roi(0.6, 0.2, trid, plot.time_regions[trid].region)
+        self.time_table.select_row_from_time_id(trid)
+        plot.split_selection()
+        self.app.processEvents()
+
+    def clear_selections(self):
+        """Removes every selection."""
+        for trid in list(self.plot.time_regions):
+            self.time_table.delete_time_id(trid)
+        self.app.processEvents()
+
+    def table_insert(self, count):
+        """Inserts time selections and ROIs straight into the tables."""
+        lo, hi = self.span(0, 1)
+        starts = np.linspace(lo, hi, count)
+        first = self.plot.time_region_next_id
+        self.plot.time_region_next_id += count
+        trids = list(range(first, first + count))
+        empty = [(np.nan,) * 4] * count
+        self.time_table.insert_time_selections(starts.tolist(), (starts + 1).tolist(), trids, empty)
+        self.roi_table.insert_rois(trids, [0] * count, [0.1] * count, [0.5] * count)
+        self.app.processEvents()
+        self.inserted = trids
+
+    def clear_tables(self):
+        """Removes the rows added by table_insert."""
+        self.selections.remove([(trid, roi) for trid in getattr(self, "inserted", []) for roi in (None, 0)])
+        self.inserted = []
+
+    def near_table_fill(self, points):
+        """Fills the near table with generated points."""
+        rng = np.random.default_rng(self.seed)
+        lo, hi = self.span(0, 1)
+        ids = rng.integers(0, self.traces, points)
+        trace_colors = [self.plot.traces[name]["color"] for name in self.plot.store.names]
+        self.near_table.set_points(ids, rng.uniform(lo, hi, points), rng.random(points),
+                                   self.plot.store.names, trace_colors)
+        self.app.processEvents()
+
+    def close(self):
+        """Stops the workers and closes the widgets."""
+        self.window.close()
+
+
+def run(sizes, traces, repeat, selections, seed):
+    """
+    Runs every benchmark for every size.
+
+    Args:
+        sizes (list): Total point counts.
+        traces (int): Number of traces.
+        repeat (int): Runs per benchmark.
+        selections (int): Selections created per run of the selection benchmarks.
+        seed (int): Seed for the generated data.
+
+    Returns:
+        list: One result dict per benchmark and size.
+    """
+    app = QApplication.instance() or QApplication([])
+    results = []
+    for size in sizes:
+        bench = Bench(app, size, traces, seed)
+        cases = [
+            ("generate_traces", bench.generate, repeat, None),
+            ("gen_data", bench.gen_data, repeat, None),
+            ("plot_data", bench.plot_data, repeat, bench.generate),
+            ("near_mouse_table", bench.near, repeat, None),
+            ("contrast_color_switch", bench.style_switch, repeat, None),
+            ("selections_with_rois", lambda: bench.selections_with_rois(selections), repeat, None),
+            ("split_selection", bench.split, repeat, None),
+            ("clear_selections", bench.clear_selections, 1, None),
+            ("selection_table_insert", lambda: bench.table_insert(10 * selections), repeat, bench.clear_tables),
+            ("near_table_fill", lambda: bench.near_table_fill(min(size, 100_000)), repeat, None),
+        ]
+        for name, fn, n, setup in cases:
+            result = {"name": name, "size": size, **measure(fn, n, setup)}
+            results.append(result)
+            print(f"{name:24} {size:>10} {result['median'] * 1000:10.2f} ms", flush=True)
+        bench.close()
+    return results
+
+
+def metadata():
+    """Describes the build and machine the results come from."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"date": datetime.now(timezone.utc).isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pyqtgraph": pyqtgraph.__version__,
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM")}
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how results moved against a baseline.
+
+    Args:
+        results (list): New results.
+        baseline (dict): Contents of a previous result file.
+        threshold (float): Slowdown ratio reported as a regression.
+
+    Returns:
+        list: (name, size, ratio) of every regression.
+    """
+    old = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        before = old.get((r["name"], r["size"]))
+        if before is None or before["median"] <= 0:
+            continue
+        ratio = r["median"] / before["median"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{r['name']:24} {r['size']:>10} {ratio:8.2f}x{flag}")
+        if flag:
+            regressions.append((r["name"], r["size"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5, 1e6, 1e7],
+                        help="total point counts to run")
+    parser.add_argument("--traces", type=int, default=48, help="number of traces")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--selections", type=int, default=100, help="selections created per run")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated data")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON file to write")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes], args.traces, args.repeat, args.selections, args.seed)
+    with open(args.out, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
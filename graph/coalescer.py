@@ -0,0 +1,66 @@
+from PyQt6.QtCore import QObject, QTimer
+
+
+class Coalescer(QObject):
+    """
+    Batches repeated updates so each runs at most once per frame.
+
+    Updates are posted under a key and only the latest call per key is kept.
+    The first post arms a single-shot timer, and when it fires every pending
+    call runs once in posting order. flush runs pending calls right away,
+    for final updates such as the end of a drag.
+    """
+
+    def __init__(self, interval: int = 16, parent=None):
+        """
+        Initializes the Coalescer.
+
+        Args:
+            interval (int): Milliseconds between batches, about one frame.
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.pending = dict()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def post(self, key, fn, *args):
+        """
+        Schedules a call, replacing any pending call with the same key.
+
+        Args:
+            key: Identifies the update.
+            fn: Function to call.
+            *args: Arguments for fn.
+        """
+        self.pending[key] = (fn, args)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def discard(self, key):
+        """
+        Drops a pending call without running it.
+
+        Args:
+            key: Identifies the update.
+        """
+        self.pending.pop(key, None)
+
+    def flush(self, key=None):
+        """
+        Runs pending calls now.
+
+        Args:
+            key: Only run the call with this key, all calls when None.
+        """
+        if key is not None:
+            entry = self.pending.pop(key, None)
+            if entry is not None:
+                entry[0](*entry[1])
+            return
+        self.timer.stop()
+        pending, self.pending = self.pending, dict()
+        for fn, args in pending.values():
+            fn(*args)
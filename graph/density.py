@@ -0,0 +1,103 @@
+import numpy as np
+
+from .trace_store import TraceStore
+
+
+def count_visible(store: TraceStore, tids, x_range):
+    """
+    Counts the points of some traces inside a time range.
+
+    Args:
+        store (TraceStore): Store holding the trace points.
+        tids: Ids of the traces to count.
+        x_range (tuple): Start and stop time.
+
+    Returns:
+        int: Number of points in range.
+    """
+    count = 0
+    for tid in tids:
+        s = store.time_slice(tid, *x_range)
+        count += s.stop - s.start
+    return count
+
+
+def _sample_runs(start, stop, stride, run=512):
+    """
+    Picks one run of consecutive positions out of every stride runs.
+
+    Args:
+        start (int): First position.
+        stop (int): End position, exclusive.
+        stride (int): Sampling period in runs.
+        run (int): Number of consecutive positions per run.
+
+    Returns:
+        np.ndarray: Sampled positions.
+    """
+    firsts = np.arange(start, stop, stride * run)
+    idx = (firsts[:, None] + np.arange(run)).ravel()
+    return idx[idx < stop]
+
+
+def density_image(store: TraceStore, tids, x_range, y_range, shape, colors=None, max_points=4_000_000):
+    """
+    Bins the points of some traces into an RGBA density image.
+
+    Brightness follows the log of the point count in each bin. With colors
+    given, each bin takes the count-weighted mean color of the traces in it,
+    otherwise it is white. Above max_points in range, every trace is sampled
+    at the same rate in contiguous runs, which keeps the cost bounded, the
+    relative densities intact and memory-mapped reads to the sampled pages.
+
+    Args:
+        store (TraceStore): Store holding the trace points.
+        tids: Ids of the traces to bin.
+        x_range (tuple): Time range covered by the image.
+        y_range (tuple): Value range covered by the image.
+        shape (tuple): Number of bins along x and y.
+        colors (dict): Optional RGB triple in [0, 1] for each trace id.
+        max_points (int): Number of points above which points are strided.
+
+    Returns:
+        np.ndarray: uint8 array of shape (nx, ny, 4), x along the first axis.
+    """
+    nx, ny = max(int(shape[0]), 1), max(int(shape[1]), 1)
+    (xlo, xhi), (ylo, yhi) = x_range, y_range
+    xscale = nx / (xhi - xlo) if xhi > xlo else 0.0
+    yscale = ny / (yhi - ylo) if yhi > ylo else 0.0
+
+    slices = {tid: store.time_slice(tid, xlo, xhi) for tid in tids}
+    stride = max(1, -(-sum(s.stop - s.start for s in slices.values()) // max_points))
+
+    bins, lengths, palette = [], [], []
+    for tid, s in slices.items():
+        if stride > 1:
+            s = _sample_runs(s.start, s.stop, stride)
+        x = store.times(tid)[s]
+        y = store.values(tid)[s]
+        keep = (y >= ylo) & (y < yhi)
+        ix = np.minimum(((x[keep] - xlo) * xscale).astype(np.int64), nx - 1)
+        iy = np.minimum(((y[keep] - ylo) * yscale).astype(np.int64), ny - 1)
+        bins.append(ix * ny + iy)
+        lengths.append(len(ix))
+        if colors is not None:
+            palette.append(colors[tid])
+
+    bins = np.concatenate(bins) if bins else np.empty(0, dtype=np.int64)
+    total = np.bincount(bins, minlength=nx * ny)
+    if colors is not None and len(bins):
+        palette = np.asarray(palette, dtype=np.float64)
+        rgb = np.stack([np.bincount(bins, np.repeat(palette[:, c], lengths), nx * ny)
+                        for c in range(3)], axis=1)
+
+    image = np.zeros((nx * ny, 4), dtype=np.uint8)
+    filled = total > 0
+    if filled.any():
+        level = np.log1p(total[filled]) / np.log1p(total.max())
+        image[filled, 3] = (64 + 191 * level).astype(np.uint8)
+        if colors is None:
+            image[filled, :3] = 255
+        else:
+            image[filled, :3] = (255 * rgb[filled] / total[filled, None]).astype(np.uint8)
+    return image.reshape(nx, ny, 4)
@@ -0,0 +1,96 @@
+import numpy as np
+from datetime import datetime, timezone
+
+
+class EventGenerator:
+    """Generates synthetic event-time traces in chunks of NumPy arrays."""
+
+    def __init__(self,
+                 seed=None,
+                 rate: float = 1/800,
+                 duration: float = 3600.0,
+                 traces: int = 48,
+                 stop: float = None,
+                 chunk_size: int = 1 << 20):
+        """
+        Initializes the EventGenerator.
+
+        Args:
+            seed: Seed for the random generator, None for fresh entropy.
+            rate (float): Mean number of events per second in each trace.
+            duration (float): Length of the generated window in seconds.
+            traces (int): Number of traces to generate.
+            stop (float): End of the window as epoch seconds, defaults to now.
+            chunk_size (int): Maximum number of events drawn per chunk.
+        """
+        if stop is None:
+            stop = datetime.now().astimezone(timezone.utc).timestamp()
+        self.rate = rate
+        self.duration = duration
+        self.traces = traces
+        self.stop = stop
+        self.start = stop - duration
+        self.chunk_size = chunk_size
+        self.seeds = np.random.SeedSequence(seed).spawn(traces)
+
+    def _chunk_length(self, t):
+        """
+        Estimates how many events are needed to cover the rest of the window.
+
+        Args:
+            t (float): Time of the last generated event.
+
+        Returns:
+            int: Number of intervals to draw for the next chunk.
+        """
+        expected = (self.stop - t) * self.rate
+        n = int(expected + 4 * np.sqrt(expected) + 16)
+        return min(n, self.chunk_size)
+
+    def chunks(self, i):
+        """
+        Yields the event times of one trace chunk by chunk.
+
+        Args:
+            i (int): Trace index.
+
+        Yields:
+            np.ndarray: Increasing float64 event times inside the window.
+        """
+        rng = np.random.default_rng(self.seeds[i])
+        scale = 1 / self.rate
+        t = self.start
+        while True:
+            times = rng.exponential(scale, self._chunk_length(t))
+            times[0] += t
+            np.cumsum(times, out=times)
+            if times[-1] >= self.stop:
+                yield times[:np.searchsorted(times, self.stop)]
+                return
+            yield times
+            t = times[-1]
+
+    def trace(self, i):
+        """
+        Generates the full event-time array of one trace.
+
+        Args:
+            i (int): Trace index.
+
+        Returns:
+            np.ndarray: Increasing float64 event times.
+        """
+        chunks = list(self.chunks(i))
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
+    def generate(self):
+        """
+        Generates every trace in order.
+
+        Yields:
+            tuple: The trace index and its event-time array.
+        """
+        for i in range(self.traces):
+            yield i, self.trace(i)
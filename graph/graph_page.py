@@ -1,16 +1,22 @@
 import pyqtgraph
-from PyQt6.QtWidgets import QMainWindow, QApplication, QDockWidget, QTextEdit
+from PyQt6.QtWidgets import QMainWindow, QApplication, QDockWidget, QTextEdit, QInputDialog, QFileDialog, QMessageBox
 from PyQt6.QtGui import QAction, QCursor, QKeySequence
 from PyQt6.QtCore import Qt
 import numpy as np
 from datetime import datetime, timezone, timedelta
 from uuid import uuid4
+from zoneinfo import ZoneInfo, available_timezones
 
 from .plot_widget import ScatterPlot
-from .trace_table import ButtonTable
+from .trace_table import TraceTable, TracePanel
 from .mouse_near_table import NearTable
 from .linked_table import TimeTable, ROITable
+from .selection_model import SelectionModel
+from .time_format import PRECISIONS, time_formatter
 from .special_regions import BoundROI
+from .stats_table import StatsTable
+from .streaming import SimulatedSource, SocketSource
+from .profiler_hud import ProfilerHUD
 
 
 class GraphWindow(QMainWindow):
@@ -21,9 +27,42 @@ class GraphWindow(QMainWindow):
         super().__init__()
 
         menu = self.menuBar()
+        file_menu = menu.addMenu("File")
+        open_file = file_menu.addAction("Open...")
+        open_file.setShortcut(QKeySequence("Ctrl+O"))
+        save_file = file_menu.addAction("Save As...")
+        save_file.setShortcut(QKeySequence("Ctrl+S"))
+        file_menu.addSeparator()
+        import_selections = file_menu.addAction("Import Selections...")
+        export_selections = file_menu.addAction("Export Selections...")
+
         mode_menu = menu.addMenu("Mode")
         contrast = mode_menu.addAction("Contrast Mode")
         color = mode_menu.addAction("Color Mode")
+        mode_menu.addSeparator()
+        scatter = mode_menu.addAction("Scatter Mode")
+        density = mode_menu.addAction("Density Mode")
+        auto_render = mode_menu.addAction("Auto Density Mode")
+        mode_menu.addSeparator()
+        merged = mode_menu.addAction("Merged Traces")
+        merged.setCheckable(True)
+        mode_menu.addSeparator()
+        time_precision = mode_menu.addAction("Time Precision...")
+        time_zone = mode_menu.addAction("Time Zone...")
+
+        stream_menu = menu.addMenu("Stream")
+        simulate_stream = stream_menu.addAction("Simulate Live Stream")
+        listen_stream = stream_menu.addAction("Listen on Port...")
+        stop_stream = stream_menu.addAction("Stop Stream")
+        stream_capacity = stream_menu.addAction("Points Kept per Trace...")
+        stream_menu.addSeparator()
+        follow_stream = stream_menu.addAction("Follow Live")
+        follow_stream.setCheckable(True)
+        follow_stream.setChecked(True)
+
+        lookup_menu = menu.addMenu("Lookup")
+        near_count = lookup_menu.addAction("Nearest Points Count...")
+        near_radius = lookup_menu.addAction("Nearest Points Radius...")
 
         selections_menu = menu.addMenu("Selections")
         delete_selected_times = selections_menu.addAction("Delete Selected Times")
@@ -32,30 +71,73 @@ class GraphWindow(QMainWindow):
         delete_selected_roi.setShortcut(QKeySequence("Del"))
         split_selected_time = selections_menu.addAction("Split Selected Times")
         split_selected_time.setShortcut(QKeySequence("Shift+S"))
+        split_parts = selections_menu.addAction("Split Selected Times Into...")
+        split_times = selections_menu.addAction("Split Selected Times At...")
+        split_gaps = selections_menu.addAction("Split Selected Times At Gaps...")
+        merge_selected_times = selections_menu.addAction("Merge Selected Times")
+        merge_selected_times.setShortcut(QKeySequence("Ctrl+M"))
+        merge_selections = selections_menu.addAction("Merge Overlapping Times")
+        merge_selections.setShortcut(QKeySequence("Shift+M"))
 
-        self.trace_table = ButtonTable(12)
+        self.view_menu = menu.addMenu("View")
+
+        self.trace_table = TraceTable()
         self.near_table = NearTable()
-        self.time_selections = TimeTable()
-        self.roi_table = ROITable()
+        self.selections = SelectionModel(self)
+        self.time_selections = TimeTable(self.selections)
+        self.roi_table = ROITable(self.selections)
+        self.stats_table = StatsTable()
+        self.profiler_hud = ProfilerHUD()
         self.plot = ScatterPlot(self.trace_table,
                                 self.near_table,
                                 self.time_selections,
-                                self.roi_table)
+                                self.roi_table,
+                                self.stats_table)
         
 
         color.triggered.connect(self.plot.color_mode)
         contrast.triggered.connect(self.plot.contrast_mode)
+        scatter.triggered.connect(self.plot.scatter_mode)
+        density.triggered.connect(self.plot.density_mode)
+        auto_render.triggered.connect(self.plot.auto_render_mode)
+        merged.toggled.connect(self.plot.set_merged)
+        time_precision.triggered.connect(self.ask_time_precision)
+        time_zone.triggered.connect(self.ask_time_zone)
+
+        open_file.triggered.connect(self.open_file)
+        save_file.triggered.connect(self.save_file)
+        import_selections.triggered.connect(self.import_selections)
+        export_selections.triggered.connect(self.export_selections)
+
+        simulate_stream.triggered.connect(lambda: self.plot.start_stream(SimulatedSource()))
+        listen_stream.triggered.connect(self.listen_stream)
+        stop_stream.triggered.connect(self.plot.stop_stream)
+        stream_capacity.triggered.connect(self.ask_stream_capacity)
+        follow_stream.toggled.connect(self.plot.set_follow)
+
+        near_count.triggered.connect(self.ask_near_count)
+        near_radius.triggered.connect(self.ask_near_radius)
 
         delete_selected_times.triggered.connect(self.time_selections.delete_row)
         delete_selected_roi.triggered.connect(self.roi_table.delete_row)
 
-        split_selected_time.triggered.connect(self.plot.split_selection)
+        split_selected_time.triggered.connect(lambda: self.plot.split_selection())
+        split_parts.triggered.connect(self.ask_split_parts)
+        split_times.triggered.connect(self.ask_split_times)
+        split_gaps.triggered.connect(self.ask_split_gap)
+        merge_selected_times.triggered.connect(
+            lambda: self.plot.merge_time_selections(self.time_selections.ids_from_selection()))
+        merge_selections.triggered.connect(lambda: self.plot.merge_selections())
+
+        self.plot.workers.job_failed.connect(lambda message: self.statusBar().showMessage(message.splitlines()[-1]))
 
         self.plot.time_region_added.connect(self.time_selections.insert_time_selection)
+        self.plot.time_regions_added.connect(self.time_selections.insert_time_selections)
         self.plot.time_region_changed.connect(self.time_selections.update_table)
         self.time_selections.time_selection_deleted.connect(self.plot.remove_time_selection)
         self.roi_table.roi_deleted.connect(self.plot.remove_roi)
         self.time_selections.itemSelectionChanged.connect(self.plot.show_roi)
+        self.time_selections.itemSelectionChanged.connect(self.plot.show_stats)
 
         self.time_selections.doubleclick.connect(self.plot.setview_time_select)
         self.roi_table.doubleclick.connect(self.plot.setview_roi)        
@@ -64,6 +146,133 @@ class GraphWindow(QMainWindow):
         self.init_docks()
         
 
+    def open_file(self):
+        """Asks for a trace file and shows its traces."""
+        path, _ = QFileDialog.getOpenFileName(self, "Open Traces", "", "Trace files (*.qtr);;All files (*)")
+        if path:
+            try:
+                self.plot.load_file(path)
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                QMessageBox.warning(self, "Open Traces", str(error))
+
+    def save_file(self):
+        """Asks for a file name and saves the current traces."""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Traces", "", "Trace files (*.qtr)")
+        if path:
+            try:
+                self.plot.save_file(path)
+            except (OSError, ValueError) as error:
+                QMessageBox.warning(self, "Save Traces", str(error))
+
+    def import_selections(self):
+        """Asks for a selection file and adds its time selections and ROIs."""
+        path, _ = QFileDialog.getOpenFileName(self, "Import Selections", "",
+                                              "Selection files (*.qsel *.json);;All files (*)")
+        if path:
+            try:
+                self.plot.load_selections(path)
+            except (OSError, ValueError, KeyError) as error:
+                QMessageBox.warning(self, "Import Selections", str(error))
+
+    def export_selections(self):
+        """Asks for a file name and saves every time selection and ROI."""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Selections", "",
+                                              "Selection files (*.qsel);;JSON (*.json)")
+        if path:
+            try:
+                self.plot.save_selections(path)
+            except OSError as error:
+                QMessageBox.warning(self, "Export Selections", str(error))
+
+    def listen_stream(self):
+        """Asks for a port and streams "<name> <epoch seconds>" lines sent to it."""
+        port, ok = QInputDialog.getInt(self, "Live Stream", "Listen on port:", 5555, 1, 65535)
+        if ok:
+            try:
+                source = SocketSource(port=port)
+            except OSError as e:
+                QMessageBox.warning(self, "Live Stream", str(e))
+                return
+            self.plot.start_stream(source)
+
+    def ask_stream_capacity(self):
+        """Asks for the number of points every live trace keeps, used from the next stream on."""
+        capacity, ok = QInputDialog.getInt(self, "Live Stream", "Points kept per trace (next stream):",
+                                           self.plot.stream_capacity, 1000, 100_000_000, 1000)
+        if ok:
+            self.plot.set_stream_capacity(capacity)
+
+    def closeEvent(self, event):
+        """Stops the live stream and background jobs before closing."""
+        self.plot.stop_stream()
+        self.plot.workers.cancel("load")
+        self.plot.workers.wait(1000)
+        super().closeEvent(event)
+
+    def ask_time_precision(self):
+        """Asks the user for the smallest time unit shown in the tables."""
+        precisions = list(PRECISIONS)
+        precision, ok = QInputDialog.getItem(self, "Time Format", "Precision:", precisions,
+                                             precisions.index(time_formatter.precision), False)
+        if ok:
+            time_formatter.set_precision(precision)
+
+    def ask_time_zone(self):
+        """Asks the user for the timezone times are shown in."""
+        zones = ["UTC", "Local"] + sorted(available_timezones())
+        current = "UTC" if time_formatter.tz is timezone.utc else "Local" if time_formatter.tz is None else str(time_formatter.tz)
+        name, ok = QInputDialog.getItem(self, "Time Format", "Time zone:", zones,
+                                        zones.index(current) if current in zones else 0, False)
+        if ok:
+            time_formatter.set_timezone(timezone.utc if name == "UTC" else None if name == "Local" else ZoneInfo(name))
+
+    def ask_split_parts(self):
+        """Asks the user how many equal parts to split the selected time selections into."""
+        parts, ok = QInputDialog.getInt(self, "Split Selections", "Parts per selection:", 60, 2, 100000)
+        if ok:
+            self.plot.split_even(self.time_selections.ids_from_selection(), parts)
+
+    def ask_split_times(self):
+        """Asks the user for timestamps to split the selected time selections at."""
+        text, ok = QInputDialog.getText(self, "Split Selections",
+                                        "Times, comma separated, as ISO times or epoch seconds:")
+        if not ok:
+            return
+        times = []
+        try:
+            for part in filter(None, (part.strip() for part in text.split(","))):
+                try:
+                    times.append(float(part))
+                except ValueError:
+                    t = datetime.fromisoformat(part)
+                    if t.tzinfo is None:
+                        t = t.replace(tzinfo=time_formatter.tz) if time_formatter.tz is not None else t.astimezone()
+                    times.append(t.timestamp())
+        except ValueError as error:
+            QMessageBox.warning(self, "Split Selections", str(error))
+            return
+        self.plot.split_at_times(self.time_selections.ids_from_selection(), times)
+
+    def ask_split_gap(self):
+        """Asks the user for the shortest gap in the data that splits the selected time selections."""
+        gap, ok = QInputDialog.getDouble(self, "Split Selections", "Shortest gap (seconds):", 60, 0, 1e9, 3)
+        if ok:
+            self.plot.split_at_gaps(self.time_selections.ids_from_selection(), gap)
+
+    def ask_near_count(self):
+        """Asks the user for the number of points shown in the near table."""
+        count, ok = QInputDialog.getInt(self, "Nearest Points", "Points to show:",
+                                        self.plot.near_count, 1, 100000)
+        if ok:
+            self.plot.set_near_count(count)
+
+    def ask_near_radius(self):
+        """Asks the user for the near table search radius in pixels."""
+        radius, ok = QInputDialog.getDouble(self, "Nearest Points", "Radius (pixels):",
+                                            self.plot.near_radius, 1, 10000, 1)
+        if ok:
+            self.plot.set_near_radius(radius)
+
     def init_docks(self):
         """Initializes dock widgets for the main window."""
         self.setCentralWidget(self.plot)
@@ -72,17 +281,30 @@ class GraphWindow(QMainWindow):
         dock.setWidget(self.near_table)
 
         traces_doc = QDockWidget("Dockable Widget", self)
-        traces_doc.setWidget(self.trace_table)
+        traces_doc.setWidget(TracePanel(self.trace_table))
         
         time_selections_dock = QDockWidget("Time Selections", self)
         time_selections_dock.setWidget(self.time_selections)
 
         selection_info_dock = QDockWidget("Selection Info", self)
         selection_info_dock.setWidget(self.roi_table)
+
+        stats_dock = QDockWidget("Selection Stats", self)
+        stats_dock.setWidget(self.stats_table)
         # Add dock widgets to the main window
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, time_selections_dock)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, selection_info_dock)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, stats_dock)
         
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, traces_doc)
         self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, dock)
 
+        profiler_dock = QDockWidget("Profiler", self)
+        profiler_dock.setWidget(self.profiler_hud)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, profiler_dock)
+        profiler_dock.hide()
+        profiler_hud = profiler_dock.toggleViewAction()
+        profiler_hud.setText("Profiler HUD")
+        profiler_hud.setShortcut(QKeySequence("Ctrl+Shift+P"))
+        self.view_menu.addAction(profiler_hud)
+
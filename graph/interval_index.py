@@ -0,0 +1,169 @@
+import numpy as np
+
+
+class IntervalIndex:
+    """
+    An interval tree over keyed [lo, hi] intervals, such as time selections.
+
+    Intervals are kept sorted by start with a max-end tree on top: every
+    node holds the largest end below it, so queries only descend into
+    subtrees that can still overlap and cost O(log n + k). Changes only mark
+    the tree stale; it is rebuilt in O(n log n) on the next query, so drags
+    that move an interval every frame cost nothing until someone asks.
+    """
+
+    def __init__(self):
+        """Initializes the IntervalIndex."""
+        self.bounds = dict()
+        self.dirty = False
+        self.keys = []
+        self.starts = np.empty(0)
+        self.ends = np.empty(0)
+        self.size = 1
+        self.tree = [-np.inf, -np.inf]
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, key):
+        return key in self.bounds
+
+    def set(self, key, lo, hi):
+        """
+        Adds an interval or moves an existing one.
+
+        Args:
+            key: Identifies the interval.
+            lo (float): Start.
+            hi (float): End.
+        """
+        if lo > hi:
+            lo, hi = hi, lo
+        self.bounds[key] = (lo, hi)
+        self.dirty = True
+
+    def remove(self, key):
+        """
+        Removes an interval if present.
+
+        Args:
+            key: Identifies the interval.
+        """
+        if self.bounds.pop(key, None) is not None:
+            self.dirty = True
+
+    def _build(self):
+        """Sorts the intervals by start and rebuilds the max-end tree."""
+        keys = list(self.bounds.keys())
+        bounds = np.array([self.bounds[k] for k in keys], dtype=np.float64).reshape(-1, 2)
+        order = np.argsort(bounds[:, 0], kind="stable")
+        self.keys = [keys[i] for i in order]
+        self.starts = bounds[order, 0]
+        self.ends = bounds[order, 1]
+
+        n = len(self.keys)
+        size = 1
+        while size < n:
+            size *= 2
+        tree = np.full(2 * size, -np.inf)
+        tree[size:size+n] = self.ends
+        lo = size
+        while lo > 1:
+            lo //= 2
+            tree[lo:2*lo] = np.maximum(tree[2*lo:4*lo:2], tree[2*lo+1:4*lo:2])
+        self.size = size
+        self.tree = tree.tolist()
+        self.dirty = False
+
+    def _positions(self, lo, hi):
+        """
+        Finds the sorted positions of the intervals overlapping [lo, hi].
+
+        Args:
+            lo (float): Start of the query range.
+            hi (float): End of the query range.
+
+        Returns:
+            list: Positions in start order.
+        """
+        if self.dirty:
+            self._build()
+        limit = int(np.searchsorted(self.starts, hi, "right"))
+        tree, size = self.tree, self.size
+        found = []
+        stack = [(1, 0, size)]
+        while stack:
+            node, left, right = stack.pop()
+            if left >= limit or tree[node] < lo:
+                continue
+            if node >= size:
+                found.append(left)
+                continue
+            mid = (left + right) // 2
+            stack.append((2 * node + 1, mid, right))
+            stack.append((2 * node, left, mid))
+        return found
+
+    def overlap(self, lo, hi):
+        """
+        Finds the intervals overlapping a range, touching ends included.
+
+        Args:
+            lo (float): Start of the range.
+            hi (float): End of the range.
+
+        Returns:
+            list: Keys in start order.
+        """
+        if lo > hi:
+            lo, hi = hi, lo
+        return [self.keys[i] for i in self._positions(lo, hi)]
+
+    def stab(self, t):
+        """
+        Finds the intervals covering a point.
+
+        Args:
+            t (float): The point.
+
+        Returns:
+            list: Keys in start order.
+        """
+        return self.overlap(t, t)
+
+    def innermost(self, t):
+        """
+        Finds the narrowest interval covering a point.
+
+        Args:
+            t (float): The point.
+
+        Returns:
+            The key, or None when no interval covers t.
+        """
+        positions = self._positions(t, t)
+        if not positions:
+            return None
+        best = min(positions, key=lambda i: self.ends[i] - self.starts[i])
+        return self.keys[best]
+
+    def merge_groups(self, gap=0.0):
+        """
+        Groups intervals that overlap or lie within gap of each other, transitively.
+
+        Args:
+            gap (float): Largest distance between intervals that still merges them.
+
+        Returns:
+            list: One (keys, lo, hi) tuple per group of two or more intervals.
+        """
+        if self.dirty:
+            self._build()
+        if not len(self.keys):
+            return []
+        reach = np.maximum.accumulate(self.ends)
+        breaks = np.flatnonzero(self.starts[1:] > reach[:-1] + gap) + 1
+        firsts = np.concatenate(([0], breaks))
+        lasts = np.append(breaks, len(self.keys))
+        return [(self.keys[a:b], float(self.starts[a]), float(reach[b - 1]))
+                for a, b in zip(firsts, lasts) if b - a > 1]
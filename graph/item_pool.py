@@ -0,0 +1,54 @@
+class ItemPool:
+    """
+    Recycles graphics items taken out of the scene.
+
+    Building a TimeRegion or BoundROI costs far more than moving an
+    existing one, so items scrolled out of view are kept here and given
+    to the next selection scrolled into view. Items must implement
+    reuse with the same arguments as the factory.
+    """
+
+    def __init__(self, factory, limit=512):
+        """
+        Initializes the ItemPool.
+
+        Args:
+            factory: Creates a new item when the pool is empty.
+            limit (int): Most items kept for reuse.
+        """
+        self.factory = factory
+        self.limit = limit
+        self.free = []
+
+    def __len__(self):
+        return len(self.free)
+
+    def take(self, *args):
+        """
+        Gets a pooled item set up with the arguments, or a new one.
+
+        Args:
+            *args: Arguments for the factory or the item's reuse.
+
+        Returns:
+            The item.
+        """
+        if self.free:
+            item = self.free.pop()
+            item.reuse(*args)
+            return item
+        return self.factory(*args)
+
+    def release(self, item):
+        """
+        Keeps an item already taken out of the scene for reuse.
+
+        Args:
+            item: The item.
+        """
+        if len(self.free) < self.limit:
+            self.free.append(item)
+
+    def clear(self):
+        """Drops every pooled item."""
+        self.free = []
@@ -1,94 +1,156 @@
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
-from PyQt6.QtGui import QColor, QPixmap, QIcon
-from PyQt6.QtCore import QPointF, pyqtSignal, Qt
+from PyQt6.QtWidgets import QTableView, QAbstractItemView, QHeaderView
+from PyQt6.QtCore import pyqtSignal, Qt
 
-class TimeTable(QTableWidget):
-    """A table widget for managing time selections."""
+from .selection_model import SelectionModel, SelectionFilter, ID_ROLE
+from .profiler import profiled
 
-    time_selection_deleted = pyqtSignal(int)
-    doubleclick = pyqtSignal(int)
+class _SelectionView(QTableView):
+    """A read-only, single row selection view over the shared selection model."""
+
+    itemSelectionChanged = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, selections: SelectionModel, rois, parent=None):
         """
-        Initializes the TimeTable.
+        Initializes the view.
 
         Args:
+            selections (SelectionModel): The shared selections.
+            rois (bool): Show ROIs instead of time selections.
             parent: Parent widget (optional).
         """
-        super().__init__(0, 2, parent)  # Start with 0 rows
-        self.setColumnCount(2)
+        super().__init__(parent)
+        self.selections = selections
+        self.proxy = SelectionFilter(selections, rois, self)
+        self.setModel(self.proxy)
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.setHorizontalHeaderLabels(["Start","Stop"])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.horizontalHeader().setResizeContentsPrecision(0)
+        self.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.verticalHeader().setVisible(False)
+        self.selectionModel().selectionChanged.connect(lambda *_: self.itemSelectionChanged.emit())
 
-        self.init_variables()
+    def _selected_id(self):
+        current = self.currentIndex()
+        if current.isValid() and self.selectionModel().isRowSelected(current.row(), current.parent()):
+            return current.siblingAtColumn(0).data(ID_ROLE)
+        selected = self.selectionModel().selectedRows()
+        if selected:
+            return selected[0].data(ID_ROLE)
 
-    def init_variables(self):
-        """Initializes internal variables."""
-        self.row_info = dict()
-        
+    def _select_source_row(self, row):
+        if row is None:
+            return
+        index = self.proxy.mapFromSource(self.selections.index(row, 0))
+        if index.isValid():
+            self.selectRow(index.row())
+
+    def resize_columns(self):
+        """Sizes the columns to the rows in view, without reading the rest of the model."""
+        self.resizeColumnsToContents()
+
+
+class TimeTable(_SelectionView):
+    """A table view for managing time selections, several of which can be selected at once."""
+
+    time_selection_deleted = pyqtSignal(int)
+    doubleclick = pyqtSignal(int)
+
+    def __init__(self, selections: SelectionModel, parent=None):
+        """
+        Initializes the TimeTable.
+
+        Args:
+            selections (SelectionModel): The shared selections.
+            parent: Parent widget (optional).
+        """
+        super().__init__(selections, False, parent)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+    @profiled("TimeTable.insert_time_selection")
     def insert_time_selection(self, start, stop, time_id):
         """
         Inserts a new time selection into the table.
 
         Args:
-            start (str): Start time of the selection.
-            stop (str): Stop time of the selection.
+            start (float): Start time of the selection.
+            stop (float): Stop time of the selection.
             time_id (int): Unique ID for the time selection.
         """
-        row = self.rowCount()
-        self.insertRow(row)
-        start_table_item = QTableWidgetItem(start[:-3])
-        stop_table_item = QTableWidgetItem(stop[:-3])
-        
-        
-        self.row_info[time_id] = {"start":start_table_item,
-                                  "stop":stop_table_item}
-        self.setItem(row, 0, self.row_info[time_id]["start"])
-        self.setItem(row, 1, self.row_info[time_id]["stop"])
-        
-        
-        
-        idx = self.indexFromItem(self.row_info[time_id]["start"])
-        print(self.itemFromIndex(idx) is self.row_info[time_id]["start"])
-        print(idx)
-        
-    
+        self.selections.add([(time_id, None)], [start], [stop])
+        if self.proxy.rowCount() == 1:
+            self.resize_columns()
+
+    @profiled("TimeTable.insert_time_selections")
+    def insert_time_selections(self, starts, stops, time_ids, values):
+        """
+        Inserts many time selections at once.
+
+        Args:
+            starts (list): Start time of every selection.
+            stops (list): Stop time of every selection.
+            time_ids (list): Unique ID of every selection.
+            values (list): Count, rate, mean and median of every selection.
+        """
+        self.selections.add([(time_id, None) for time_id in time_ids], starts, stops, values)
+        self.resize_columns()
+
+    @profiled("TimeTable.update_table")
     def update_table(self, start, stop, time_id):
         """
         Updates an existing time selection in the table.
 
         Args:
-            start (str): Updated start time.
-            stop (str): Updated stop time.
+            start (float): Updated start time.
+            stop (float): Updated stop time.
+            time_id (int): Unique ID for the time selection.
+        """
+        self.selections.set_bounds(time_id, None, start, stop)
+
+    @profiled("TimeTable.update_stats")
+    def update_stats(self, time_id, values):
+        """
+        Shows the statistics of a time selection.
+
+        Args:
             time_id (int): Unique ID for the time selection.
+            values (tuple): Count, rate, mean and median.
         """
-        self.row_info[time_id]["start"].setText(start[:-3])
-        self.row_info[time_id]["stop"].setText(stop[:-3])
+        self.selections.set_values(time_id, None, values)
 
     def delete_row(self):
-        """Deletes the selected row and emits a signal."""
-        selected = self.selectedIndexes()
-        if selected:
-            selected = selected[0]
-        else:
+        """Deletes the selected rows and emits a signal for each."""
+        keys = self.ids_from_selection()
+        if not keys:
             return
-        start = self.takeItem(selected.row(),0)
-        self.removeRow(selected.row())
         self.clearSelection()
+        self.delete_time_ids(keys)
+
+    def delete_time_id(self, time_id):
+        """
+        Deletes the row of a time selection and its ROIs and emits a signal.
 
-        key = None
-        for k in self.row_info.keys():
-            if self.row_info[k]["start"] is start:
-                key = k
-                print(key)
-                break
-        
-        if key is not None:
-            self.row_info.pop(key)
-            self.time_selection_deleted.emit(key)
+        Args:
+            time_id (int): The ID of the time selection.
+        """
+        self.delete_time_ids([time_id])
+
+    @profiled("TimeTable.delete_time_ids")
+    def delete_time_ids(self, time_ids):
+        """
+        Deletes the rows of many time selections and their ROIs in one removal and emits a signal for each.
+
+        Args:
+            time_ids (list): The IDs of the time selections.
+        """
+        time_ids = [time_id for time_id in time_ids if self.selections.row(time_id) is not None]
+        if not time_ids:
+            return
+        self.selections.remove_times(time_ids)
+        for time_id in time_ids:
+            self.time_selection_deleted.emit(time_id)
 
     def id_from_selection(self):
         """
@@ -97,19 +159,16 @@ class TimeTable(QTableWidget):
         Returns:
             int: The ID of the selected time selection.
         """
-        selected = self.selectedIndexes()
-        if selected:
-            selected = selected[0]
-            start = self.itemFromIndex(selected)
-            
-            key = None
-            for k in self.row_info.keys():
-                if self.row_info[k]["start"] is start:
-                    key = k
-                    print(key)
-                    break
-            
-            return key
+        return self._selected_id()
+
+    def ids_from_selection(self):
+        """
+        Gets the IDs of every selected time selection.
+
+        Returns:
+            list: The IDs, in table order.
+        """
+        return [index.data(ID_ROLE) for index in sorted(self.selectionModel().selectedRows(), key=lambda index: index.row())]
 
     def select_row_from_time_id(self, time_id):
         """
@@ -118,41 +177,30 @@ class TimeTable(QTableWidget):
         Args:
             time_id (int): The ID of the time selection.
         """
-        idx = self.indexFromItem(self.row_info[time_id]["start"])
-        
-        self.selectRow(idx.row())
-    
+        self._select_source_row(self.selections.row(time_id))
+
     def mouseDoubleClickEvent(self, e):
         super().mouseDoubleClickEvent(e)
         self.doubleclick.emit(self.id_from_selection())
-    
 
-class ROITable(QTableWidget):
-    """A table widget for managing ROIs."""
+
+class ROITable(_SelectionView):
+    """A table view for managing the ROIs of one time selection."""
 
     roi_deleted = pyqtSignal(int, int)
     doubleclick = pyqtSignal(int, int)
-    def __init__(self, parent=None):
+    def __init__(self, selections: SelectionModel, parent=None):
         """
         Initializes the ROITable.
 
         Args:
+            selections (SelectionModel): The shared selections.
             parent: Parent widget (optional).
         """
-        super().__init__(0, 2, parent)  # Start with 0 rows
-        self.setColumnCount(2)
-        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.setHorizontalHeaderLabels(["Start","Stop"])
+        super().__init__(selections, True, parent)
+        self.time_id = None
 
-        self.init_variables()
-
-    def init_variables(self):
-        """Initializes internal variables."""
-        self.row_info = dict()
-    
+    @profiled("ROITable.insert_roi")
     def insert_roi(self, low, high, time_id, roi_id):
         """
         Inserts a new ROI into the table.
@@ -163,77 +211,81 @@ class ROITable(QTableWidget):
             time_id (int): Associated time selection ID.
             roi_id (int): Unique ID for the ROI.
         """
+        self.selections.add([(time_id, roi_id)], [low], [high])
+
+    @profiled("ROITable.insert_rois")
+    def insert_rois(self, time_ids, roi_ids, lows, highs):
+        """
+        Inserts many ROIs at once.
+
+        Args:
+            time_ids (list): Associated time selection ID of every ROI.
+            roi_ids (list): ID of every ROI.
+            lows (list): Lower boundary of every ROI.
+            highs (list): Upper boundary of every ROI.
+        """
+        self.selections.add(list(zip(time_ids, roi_ids)), lows, highs)
+
+    @profiled("ROITable.show_time_id")
+    def show_time_id(self, time_id):
+        """
+        Shows the ROIs of a time selection.
+
+        Args:
+            time_id (int): The ID of the time selection, None to show none.
+        """
+        if time_id == self.time_id:
+            return
         self.time_id = time_id
-        row = self.rowCount()
-        self.insertRow(row)
-        low_table_item = QTableWidgetItem(str(low))
-        high_table_item = QTableWidgetItem(str(high))
-        
-        
-        self.row_info[roi_id] = {"low":low_table_item,
-                                  "high":high_table_item}
-        self.setItem(row, 0, self.row_info[roi_id]["low"])
-        self.setItem(row, 1, self.row_info[roi_id]["high"])
-    
+        self.proxy.set_time_id(time_id)
+        self.resize_columns()
+
     def delete_row(self):
         """Deletes the selected row and emits a signal."""
-        selected = self.selectedIndexes()
-        if selected:
-            selected = selected[0]
-        else:
+        key = self._selected_id()
+        if key is None:
             return
-        low = self.takeItem(selected.row(),0)
-        self.removeRow(selected.row())
         self.clearSelection()
+        self.selections.remove([(self.time_id, key)])
+        self.roi_deleted.emit(self.time_id, key)
 
-        key = None
-        for k in self.row_info.keys():
-            if self.row_info[k]["low"] is low:
-                key = k
-                print(key)
-                break
-        
-        if key is not None:
-            self.row_info.pop(key)
-            self.roi_deleted.emit(self.time_id, key)
-    
-    def update_table(self, low, high, roi_id):
+    @profiled("ROITable.update_table")
+    def update_table(self, low, high, time_id, roi_id):
         """
         Updates an existing ROI in the table.
 
         Args:
             low (float): Updated lower boundary.
             high (float): Updated upper boundary.
+            time_id (int): Associated time selection ID.
             roi_id (int): Unique ID for the ROI.
         """
-        self.row_info[roi_id]["low"].setText(str(low))
-        self.row_info[roi_id]["high"].setText(str(high))
-    
+        self.selections.set_bounds(time_id, roi_id, low, high)
+
+    @profiled("ROITable.update_stats")
+    def update_stats(self, time_id, roi_id, values):
+        """
+        Shows the statistics of an ROI.
+
+        Args:
+            time_id (int): Associated time selection ID.
+            roi_id (int): Unique ID for the ROI.
+            values (tuple): Count, rate, mean and median.
+        """
+        self.selections.set_values(time_id, roi_id, values)
+
     def select_row_from_roi_id(self, roi_id):
         """
-        Selects a row based on the ROI ID.
+        Selects a row of the shown time selection based on the ROI ID.
 
         Args:
             roi_id (int): The ID of the ROI.
         """
-        if roi_id in self.row_info.keys(): 
-            idx = self.indexFromItem(self.row_info[roi_id]["low"])
-            self.selectRow(idx.row())
-    
+        self._select_source_row(self.selections.row(self.time_id, roi_id))
+
     def mouseDoubleClickEvent(self, e):
         super().mouseDoubleClickEvent(e)
-        selected = self.selectedIndexes()
-        if selected:
-            selected = selected[0]
-        else:
+        key = self._selected_id()
+        if key is None:
             return
-        low = self.itemFromIndex(selected)
-        
-        key = None
-        for k in self.row_info.keys():
-            if self.row_info[k]["low"] is low:
-                key = k
-                print(key)
-                break
-        
         self.doubleclick.emit(self.time_id, key)
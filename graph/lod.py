@@ -0,0 +1,194 @@
+from collections import OrderedDict
+import numpy as np
+
+from .trace_store import TraceStore
+
+
+def _segment_arg(values, extremes, firsts, counts):
+    """
+    Finds the first position of each segment's extreme value.
+
+    Args:
+        values (np.ndarray): Values split into contiguous segments.
+        extremes (np.ndarray): The extreme value of every segment.
+        firsts (np.ndarray): Start position of every segment.
+        counts (np.ndarray): Length of every segment.
+
+    Returns:
+        np.ndarray: One position per segment.
+    """
+    hits = np.flatnonzero(values == np.repeat(extremes, counts))
+    return hits[np.searchsorted(hits, firsts)]
+
+
+class LevelOfDetail:
+    """
+    Multi-resolution min/max pyramids over the traces of a TraceStore.
+
+    Level L groups events into time buckets of base_width * 2**L seconds and
+    keeps the lowest and highest valued event of every bucket. Levels are
+    built lazily in aligned blocks of block_buckets buckets, so a view only
+    ever reads the raw points under it, and blocks are cached LRU up to
+    max_cached indices.
+    """
+
+    def __init__(self,
+                 store: TraceStore,
+                 base_width: float = 1e-3,
+                 block_buckets: int = 1024,
+                 points_per_pixel: float = 2.0,
+                 max_cached: int = 1 << 23):
+        """
+        Initializes the LevelOfDetail.
+
+        Args:
+            store (TraceStore): Store holding the trace points.
+            base_width (float): Bucket width of level 0 in seconds.
+            block_buckets (int): Number of buckets per cached block.
+            points_per_pixel (float): Raw density below which full resolution is used.
+            max_cached (int): Maximum number of cached point indices.
+        """
+        self.store = store
+        self.base_width = base_width
+        self.block_buckets = block_buckets
+        self.points_per_pixel = points_per_pixel
+        self.max_cached = max_cached
+        self.blocks = OrderedDict()
+        self.cached = 0
+        self.seen = dict()
+
+    def level(self, pixel_width):
+        """
+        Finds the coarsest level whose buckets are not wider than needed.
+
+        Args:
+            pixel_width (float): Seconds covered by one screen pixel.
+
+        Returns:
+            int: Pyramid level with bucket width of at least one pixel.
+        """
+        return max(0, int(np.ceil(np.log2(max(pixel_width, 1e-300) / self.base_width))))
+
+    def invalidate(self, tid=None):
+        """
+        Drops the cached blocks of one trace, or of every trace.
+
+        Args:
+            tid (int): Trace id, None for all traces.
+        """
+        for key in [key for key in self.blocks if tid is None or key[0] == tid]:
+            self.cached -= len(self.blocks.pop(key))
+        if tid is None:
+            self.seen.clear()
+        else:
+            self.seen.pop(tid, None)
+
+    def _sync(self, tid):
+        """
+        Drops blocks made stale by appends since the trace was last read.
+
+        Appends after the last seen time only touch the blocks that end
+        after it, anything else shifts indices and clears the trace.
+
+        Args:
+            tid (int): Trace id.
+        """
+        version = int(self.store.versions[tid])
+        seen = self.seen.get(tid)
+        if seen is not None and seen[0] == version:
+            return
+        times = self.store.times(tid)
+        if seen is not None:
+            _, length, last = seen
+            if length and length <= len(times) and times[length-1] == last:
+                for key in [key for key in self.blocks if key[0] == tid]:
+                    span = self.base_width * 2**key[1] * self.block_buckets
+                    if (key[2] + 1) * span > last:
+                        self.cached -= len(self.blocks.pop(key))
+            else:
+                self.invalidate(tid)
+        self.seen[tid] = (version, len(times), times[-1] if len(times) else None)
+
+    def _block(self, tid, level, j):
+        """
+        Returns the representative point indices of one block.
+
+        Args:
+            tid (int): Trace id.
+            level (int): Pyramid level.
+            j (int): Block number, counted from time zero.
+
+        Returns:
+            np.ndarray: Sorted indices into the trace's arrays.
+        """
+        key = (tid, level, j)
+        idx = self.blocks.get(key)
+        if idx is not None:
+            self.blocks.move_to_end(key)
+            return idx
+
+        width = self.base_width * 2**level
+        start = j * width * self.block_buckets
+        a, b = np.searchsorted(self.store.times(tid), (start, start + width * self.block_buckets), "left")
+        times = self.store.times(tid)[a:b]
+        values = self.store.values(tid)[a:b]
+        if len(times):
+            bucket = np.minimum(((times - start) / width).astype(np.int64), self.block_buckets - 1)
+            firsts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+            counts = np.diff(np.append(firsts, len(times)))
+            low = _segment_arg(values, np.minimum.reduceat(values, firsts), firsts, counts)
+            high = _segment_arg(values, np.maximum.reduceat(values, firsts), firsts, counts)
+            idx = np.union1d(low, high) + a
+        else:
+            idx = np.empty(0, dtype=np.int64)
+
+        self.blocks[key] = idx
+        self.cached += len(idx)
+        while self.cached > self.max_cached and len(self.blocks) > 1:
+            _, old = self.blocks.popitem(last=False)
+            self.cached -= len(old)
+        return idx
+
+    def select(self, tid, lo, hi, pixel_width, loaded=None):
+        """
+        Picks the points of a trace to draw for a view.
+
+        The returned points cover more than the view: whole blocks for
+        reduced levels, or half a view on each side at full resolution, so
+        small pans and zooms can keep the loaded points.
+
+        Args:
+            tid (int): Trace id.
+            lo (float): Start of the visible time range.
+            hi (float): End of the visible time range.
+            pixel_width (float): Seconds covered by one screen pixel.
+            loaded (tuple): Coverage returned by an earlier call.
+
+        Returns:
+            tuple: Times, values and coverage of the points to draw, or None
+            when the loaded coverage already matches the view. Times and
+            values are views of the store at full resolution.
+        """
+        self._sync(tid)
+        version = int(self.store.versions[tid])
+        times = self.store.times(tid)
+        values = self.store.values(tid)
+        s = self.store.time_slice(tid, lo, hi)
+        if s.stop - s.start <= self.points_per_pixel * (hi - lo) / pixel_width:
+            level = -1
+        else:
+            level = self.level(pixel_width)
+        if (loaded is not None and loaded[:2] == (version, level)
+                and loaded[2] <= lo and hi <= loaded[3]):
+            return None
+
+        if level < 0:
+            half = (hi - lo) / 2
+            s = self.store.time_slice(tid, lo - half, hi + half)
+            return times[s], values[s], (version, level, lo - half, hi + half)
+
+        span = self.base_width * 2**level * self.block_buckets
+        first, last = int(np.floor(lo / span)), int(np.floor(hi / span))
+        idx = [self._block(tid, level, j) for j in range(first, last + 1)]
+        idx = idx[0] if len(idx) == 1 else np.concatenate(idx)
+        return times[idx], values[idx], (version, level, first * span, (last + 1) * span)
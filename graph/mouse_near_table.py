@@ -1,8 +1,101 @@
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
-from PyQt6.QtGui import QColor, QPixmap, QIcon
+from PyQt6.QtWidgets import QTableView, QAbstractItemView, QHeaderView
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+import numpy as np
 
-class NearTable(QTableWidget):
-    """A table widget for displaying points near the mouse cursor."""
+from .time_format import TimeFormatter, time_formatter
+from .trace_registry import registry
+from .profiler import profiled
+
+
+class NearModel(QAbstractTableModel):
+    """A table model reading nearby points straight from lookup result arrays."""
+
+    headers = ["Trace","Time","Diff"]
+
+    def __init__(self, parent=None, formatter: TimeFormatter = time_formatter):
+        """
+        Initializes the NearModel.
+
+        Args:
+            parent: Parent object (optional).
+            formatter (TimeFormatter): Formats the point times.
+        """
+        super().__init__(parent)
+        self.formatter = formatter
+        formatter.changed.connect(self.times_changed)
+        self.ids = np.empty(0, dtype=np.int32)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.names = []
+        self.colors = []
+
+    def set_points(self, ids, x, y, names, colors):
+        """
+        Replaces the displayed points.
+
+        Args:
+            ids (np.ndarray): Trace id of each point.
+            x (np.ndarray): X-coordinates of the points.
+            y (np.ndarray): Y-coordinates of the points.
+            names (list): Trace names indexed by trace id.
+            colors (list): Trace colors indexed by trace id.
+        """
+        self.beginResetModel()
+        self.ids, self.x, self.y = ids, x, y
+        self.names, self.colors = names, colors
+        self.endResetModel()
+
+    def times_changed(self):
+        """Repaints the point times after the time format changed."""
+        if len(self.x):
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self.x) - 1, 1))
+
+    def format_time(self, row):
+        """
+        Formats the time of a point, with the points after it in the same call.
+
+        Args:
+            row (int): Row of the point.
+
+        Returns:
+            str: The formatted time.
+        """
+        t = float(self.x[row])
+        text = self.formatter.cache.get(t)
+        if text is None:
+            text = self.formatter.format_many(self.x[row:row + 64])[0]
+        return text
+
+    def clear(self):
+        """Removes every point."""
+        self.set_points(np.empty(0, dtype=np.int32), np.empty(0), np.empty(0), [], [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row, col = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self.names[self.ids[row]]
+            if col == 1:
+                return self.format_time(row)
+            return str(self.y[row])
+        if role == Qt.ItemDataRole.DecorationRole and col == 0:
+            return registry.icon(self.colors[self.ids[row]])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+
+class NearTable(QTableView):
+    """A table view for displaying points near the mouse cursor."""
 
     def __init__(self, parent=None):
         """
@@ -11,49 +104,37 @@ class NearTable(QTableWidget):
         Args:
             parent: Parent widget (optional).
         """
-        super().__init__(0, 3, parent)  # Start with 0 rows
-        self.setColumnCount(3)
+        super().__init__(parent)
+        self.setModel(NearModel(self))
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
         self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.setHorizontalHeaderLabels(["Trace","Time","Diff"])
-        self.row_count = 0
-    
-    def new_row(self, color, name, x, y):
+        self.horizontalHeader().setResizeContentsPrecision(50)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+    @profiled("NearTable.set_points")
+    def set_points(self, ids, x, y, names, colors):
         """
-        Adds a new row to the table.
+        Shows a set of nearby points.
 
         Args:
-            color (str): Color of the trace.
-            name (str): Name of the trace.
-            x (float): X-coordinate of the point.
-            y (float): Y-coordinate of the point.
+            ids (np.ndarray): Trace id of each point.
+            x (np.ndarray): X-coordinates of the points.
+            y (np.ndarray): Y-coordinates of the points.
+            names (list): Trace names indexed by trace id.
+            colors (list): Trace colors indexed by trace id.
         """
-        self.insertRow(self.row_count+0)
-        
-        self.setItem(self.row_count,0,QTableWidgetItem(self.create_color_icon(QColor(color)),name))
-        self.setItem(self.row_count,1,QTableWidgetItem(str(x)))
-        self.setItem(self.row_count,2,QTableWidgetItem(str(y)))
-
+        self.model().set_points(ids, x, y, names, colors)
 
-        self.row_count += 1
-
-    def create_color_icon(self, color: str) -> QIcon:
+    def rowCount(self):
         """
-        Creates a 20x20 square icon filled with the specified color.
-
-        Args:
-            color (str): Color of the icon.
+        Returns the number of displayed points.
 
         Returns:
-            QIcon: The created icon.
+            int: Row count.
         """
-        pixmap = QPixmap(20, 20)
-        pixmap.fill(color)
-        return QIcon(pixmap)
-    
+        return self.model().rowCount()
+
     def reset_table(self):
-        """Clears the table and resets the row count."""
-        self.clearContents()
-        self.setRowCount(0)
-        self.row_count = 0
\ No newline at end of file
+        """Clears the table."""
+        self.model().clear()
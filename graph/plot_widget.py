@@ -1,71 +1,171 @@
-from pyqtgraph import PlotWidget, PlotDataItem, DateAxisItem, ViewBox, LinearRegionItem, ROI
-from PyQt6.QtGui import QAction, QCursor, QKeySequence
-from PyQt6.QtCore import QPointF, pyqtSignal, Qt
+from pyqtgraph import PlotWidget, PlotDataItem, DateAxisItem, ViewBox, LinearRegionItem, ImageItem
+from PyQt6.QtGui import QAction, QCursor, QKeySequence, QColor
+from PyQt6.QtCore import QPointF, QRectF, pyqtSignal, Qt
 import numpy as np
-from datetime import datetime, timezone, timedelta
+import time
 
-from PyQt6.QtWidgets import QMainWindow, QApplication
-from .color import colors
-from .trace_table import ButtonTable
+from .trace_registry import TraceRegistry, registry
+from .trace_table import TraceTable
 from .mouse_near_table import NearTable
 from .special_regions import TimeRegion, BoundROI
 from .linked_table import TimeTable, ROITable
+from .generator import EventGenerator
+from .trace_store import TraceStore
+from .spatial_index import NearestIndex
+from .lod import LevelOfDetail
+from .trace_item import TraceItem, MergedScatterItem
+from .density import count_visible, density_image
+from .trace_file import open_trace_file, write_trace_file
+from .ring_store import RingTraceStore
+from .streaming import StreamSource, LiveStream
+from .workers import WorkerPool
+from .selection_stats import SelectionStats
+from .stats_table import StatsTable
+from .coalescer import Coalescer
+from .interval_index import IntervalIndex
+from .selection_file import read_selections, write_selections
+from .profiler import profiler, profiled
+from .item_pool import ItemPool
+from .selection_records import SelectionRecord, RoiArrays
 
-def gen_data():
-    stop = datetime.now().astimezone(timezone.utc)
-    start = stop - timedelta(hours=1)
-    stop = stop.timestamp()
-    start = start.timestamp()
+def gen_data(seed=None, rate=1/800, duration=3600.0):
+    """
+    Generates one trace of event times ending now.
 
-    t = start
-    data = []
-    while t<stop:
-    
-        t = t+abs(float(np.random.normal(100,1000,1)))
-        data.append(t)
-    return data
+    Args:
+        seed: Seed for the random generator.
+        rate (float): Mean number of events per second.
+        duration (float): Length of the window in seconds.
+
+    Returns:
+        np.ndarray: Increasing event times as epoch seconds.
+    """
+    return EventGenerator(seed, rate, duration, traces=1).trace(0)
+
+def derive_trace(i, x=None):
+    """
+    Builds the plotted series of a trace: each event against the gap since the previous one.
+
+    Args:
+        i (int): Trace index, passed through.
+        x (np.ndarray): Event times, generated when not given.
+
+    Returns:
+        tuple: The trace index, times and values.
+    """
+    if x is None:
+        x = gen_data()
+    return i, x[1:], np.diff(x)
+
+def generate_trace(generator:EventGenerator, i):
+    """
+    Generates one trace of a generator and derives its plotted series.
+
+    Args:
+        generator (EventGenerator): Generator of the traces.
+        i (int): Trace index.
+
+    Returns:
+        tuple: The trace index, times and values.
+    """
+    return derive_trace(i, generator.trace(i))
 
 class ScatterPlot(PlotWidget):
     """A custom scatter plot widget with interactive features."""
 
-    time_region_added = pyqtSignal(str, str, int)
-    time_region_changed = pyqtSignal(str, str, int)
+    time_region_added = pyqtSignal(float, float, int)
+    time_regions_added = pyqtSignal(object, object, object, object)
+    time_region_changed = pyqtSignal(float, float, int)
 
     def __init__(self, 
-                 trace_table:ButtonTable, 
+                 trace_table:TraceTable, 
                  near_table:NearTable, 
                  time_selections:TimeTable,
-                 roi_table:ROITable):
+                 roi_table:ROITable,
+                 stats_table:StatsTable):
         """
         Initializes the ScatterPlot.
 
         Args:
-            trace_table (ButtonTable): Table for managing traces.
+            trace_table (TraceTable): Table for managing traces.
             near_table (NearTable): Table for displaying nearby points.
             time_selections (TimeTable): Table for time selections.
             roi_table (ROITable): Table for ROI selections.
+            stats_table (StatsTable): Table for the statistics of one selection.
         """
         super().__init__()
         self.setCursor(Qt.CursorShape.CrossCursor)
         self.trace_table = trace_table
+        self.trace_table.visibility_changed.connect(self.set_traces_visible)
         self.near_table = near_table
         self.time_selections  = time_selections
         self.roi_table = roi_table
+        self.stats_table = stats_table
         self.setAxisItems({"bottom":DateAxisItem(utcOffset=0)})
         self.time_selections.itemSelectionChanged.connect(self.reset_v_select)
+        self.getViewBox().sigRangeChanged.connect(self.update_view)
+        profiler.watch(self.getViewBox().sigRangeChanged, "ViewBox.sigRangeChanged")
+        profiler.watch(self.time_region_added, "time_region_added")
+        profiler.watch(self.time_regions_added, "time_regions_added")
+        profiler.watch(self.time_region_changed, "time_region_changed")
+        profiler.watch(self.trace_table.visibility_changed, "TraceTable.visibility_changed")
+        profiler.watch(self.time_selections.itemSelectionChanged, "TimeTable.itemSelectionChanged")
         self.init_variables()
+        self.density_item.setZValue(-10)
+        self.density_item.hide()
+        self.addItem(self.density_item, ignoreBounds=True)
+        self.merged_item.hide()
+        self.addItem(self.merged_item, ignoreBounds=True)
         self.init_actions()
     
     def reset_v_select(self):
         """Resets the vertical selection state."""
         self.initial = None
+
+    @profiled("paint")
+    def paintEvent(self, event):
+        """Paints the scene, timing the frame when profiling."""
+        profiler.frame()
+        super().paintEvent(event)
         
     def init_variables(self):
         """Initializes internal variables."""
         self.traces = dict()
+        self.store = TraceStore()
+        self.near_index = NearestIndex(self.store)
+        self.lod = LevelOfDetail(self.store)
+        self.stats = SelectionStats(self.store)
+        self.shown_stats = None
+        self.coalescer = Coalescer()
+        self.style_mode = "color"
+        self.render_mode = "auto"
+        self.density_threshold = 1_000_000
+        self.density_bin_size = 2
+        self.density_item = ImageItem()
+        self.merged = False
+        self.merged_item = MergedScatterItem(pen=None, symbol='o', size=10)
+        self.merged_parts = dict()
+        self.merged_ids = []
+        self.registry: TraceRegistry = registry
+        self.workers = WorkerPool()
+        self.near_count = 50
+        self.near_radius = 30.0
+        self.stream = None
+        self.stream_capacity = 100_000
+        self.follow = True
+        self.live_span = 120.0
+        self.stream_spans = None
         self.time_start = None
         self.initial = None
         self.time_regions = dict()
+        self.roi_arrays = RoiArrays()
+        self.region_index = IntervalIndex()
+        self.pending_regions = set()
+        self.live_regions = set()
+        self.materialize_budget = 0.008
+        self.cull_margin = 0.5
+        self.region_pool = ItemPool(self._new_region_item)
+        self.roi_pool = ItemPool(self._new_roi_item)
         self.time_region_next_id = 0
 
     def init_actions(self):
@@ -85,57 +185,465 @@ class ScatterPlot(PlotWidget):
         v_region.triggered.connect(self.add_roi)
         self.addAction(v_region)
 
+        region_under_cursor = QAction("select region under cursor",self)
+        region_under_cursor.setShortcut(QKeySequence("Shift+V"))
+        region_under_cursor.triggered.connect(self.select_region_under_cursor)
+        self.addAction(region_under_cursor)
+
         auto_range = QAction("Auto Range",self)
         auto_range.setShortcut(QKeySequence("Shift+A"))
         auto_range.triggered.connect(self.autoRange)
         self.addAction(auto_range)
 
         
-    def demo(self):
-        """Generates demo data for the plot."""
-        for i in range(48):
-            self.plot_data(i)  
+    def demo(self, traces=48, rate=1/800, duration=3600.0, seed=None):
+        """
+        Generates demo data for the plot.
+
+        Args:
+            traces (int): Number of traces to generate.
+            rate (float): Mean number of events per second in each trace.
+            duration (float): Length of the generated window in seconds.
+            seed: Seed for the random generator.
+        """
+        self.workers.cancel("load")
+        generator = EventGenerator(seed, rate, duration, traces)
+        for i in range(traces):
+            self.workers.submit(generate_trace, generator, i, key="load", callback=self.add_derived)
     
-    def plot_data(self,i):
+    def plot_data(self, i, x=None):
         """
-        Plots data for a given trace index.
+        Plots data for a given trace index once its series is derived on a worker.
 
         Args:
             i (int): Trace index.
+            x (np.ndarray): Event times, generated when not given.
+        """
+        self.workers.submit(derive_trace, i, x, key="load", callback=self.add_derived)
+
+    def add_derived(self, derived):
         """
-        x = np.array(gen_data())
-        y = np.diff(x)
-        x=x[1:]
+        Adds a trace whose series was derived by derive_trace.
+
+        The redraw and the selection statistics run once per frame however
+        many traces arrive in it.
+
+        Args:
+            derived (tuple): The trace index, times and values.
+        """
+        i, x, y = derived
         name = str(i).zfill(4)
-        # self.trace_added.emit(colors[i],name)
         
-        data = PlotDataItem(x=x,y=y,pen=None,symbol='o',symbolBrush=colors[i])
-        self.traces[name] = {"trace":data,"x":x,"y":y,"i":i}
-        self.trace_table.add_button(colors[i],name,lambda: self.hide_trace(self.traces[name]["trace"]))
+        tid = self.store.add_trace(name, x, y)
+        self._trace_item(i, tid, self.registry.color(i))
+        self.coalescer.post("view", self.update_view)
+        self.coalescer.post("stats", self.refresh_stats)
+
+    def _trace_item(self, i, tid, color):
+        name = self.store.names[tid]
+        data = TraceItem(self.store,tid,pen=None,symbol='o',symbolBrush=self.trace_brush(color))
+        self.traces[name] = {"trace":data,"id":tid,"i":i,"color":color,"style":"color"}
+        self.trace_table.add_trace(name, color)
         self.addItem(data)
 
+    def set_store(self, store:TraceStore, trace_colors):
+        """
+        Replaces every trace with the traces of a store.
+
+        Args:
+            store (TraceStore): Store holding the new traces.
+            trace_colors (list): Color of each trace, indexed by trace id.
+        """
+        self.workers.cancel("load")
+        self.workers.cancel("near")
+        for trace in self.traces.values():
+            self.removeItem(trace["trace"])
+        self.traces = dict()
+        self.clear_merged()
+        self.trace_table.clear_traces()
+
+        self.store = store
+        self.near_index = NearestIndex(store)
+        self.lod = LevelOfDetail(store)
+        self.stats = SelectionStats(store)
+        for tid in range(len(store)):
+            self._trace_item(tid, tid, trace_colors[tid])
+        self.autoRange()
+        self.update_view()
+        self.refresh_stats()
+
+    def load_file(self, path):
+        """
+        Opens a trace file, memory-mapped, in place of the current traces.
+
+        Args:
+            path (str): Trace file to open.
+        """
+        store, trace_colors = open_trace_file(path)
+        self.set_store(store, trace_colors)
+
+    def save_file(self, path):
+        """
+        Saves every trace to a trace file.
+
+        Args:
+            path (str): Trace file to write.
+        """
+        write_trace_file(path, self.store, [self.traces[name]["color"] for name in self.store.names])
+
+    def start_stream(self, source:StreamSource, capacity=None, fps=30.0):
+        """
+        Replaces every trace with live traces fed by a producer.
+
+        Args:
+            source (StreamSource): Producer of the events.
+            capacity (int): Number of points kept per trace, stream_capacity by default.
+            fps (float): Maximum number of redraws per second.
+        """
+        self.stop_stream()
+        store = RingTraceStore(capacity or self.stream_capacity)
+        self.set_store(store, [])
+        vb: ViewBox = self.getViewBox()
+        vb.enableAutoRange(axis=ViewBox.YAxis)
+        vb.setAutoVisible(y=True)
+        self.stream_spans = None
+        self.stream = LiveStream(source, store, fps)
+        self.stream.trace_added.connect(self.stream_trace_added)
+        self.stream.updated.connect(self.stream_updated)
+        self.stream.start()
+
+    def stop_stream(self):
+        """Stops the live stream, keeping the points received so far."""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+
+    def stream_trace_added(self, tid):
+        """
+        Adds the plot item of a trace that appeared in the live stream.
+
+        Args:
+            tid (int): Trace id.
+        """
+        self._trace_item(tid, tid, self.registry.color(tid))
+
+    def stream_updated(self):
+        """Redraws after an ingest, scrolling to the newest events when following."""
+        self.coalescer.post("stream_stats", self.refresh_stream_stats)
+        if not self.follow:
+            self.update_view()
+            return
+        latest = max((self.store.last_time(tid) for tid in range(len(self.store))
+                      if self.store.lengths[tid]), default=None)
+        if latest is None:
+            return
+        lo, hi = self.getViewBox().viewRange()[0]
+        if hi == latest:
+            self.update_view()
+            return
+        self.setXRange(latest - self.live_span, latest, padding=0)
+
+    @profiled("refresh_stream_stats")
+    def refresh_stream_stats(self):
+        """
+        Updates the quick statistics of the selections whose points changed since the last update.
+
+        Only selections overlapping the span of the newly ingested points, or
+        of the points the ring buffers dropped, are recomputed.
+        """
+        spans = np.array([(times[0], times[-1]) if len(times) else (np.nan, np.nan)
+                          for times in map(self.store.times, range(len(self.store)))]).reshape(-1, 2)
+        previous, self.stream_spans = self.stream_spans, spans
+        if not len(spans) or np.isnan(spans).all():
+            return
+        if previous is None or len(previous) != len(spans):
+            changed = [(np.nanmin(spans[:, 0]), np.nanmax(spans[:, 1]))]
+        else:
+            moved = ~((previous == spans) | np.isnan(spans))
+            changed = []
+            for column in (0, 1):
+                rows = moved[:, column]
+                if rows.any():
+                    pair = np.concatenate((previous[rows, column], spans[rows, column]))
+                    changed.append((np.nanmin(pair), np.nanmax(pair)))
+        trids = set()
+        for lo, hi in changed:
+            trids.update(self.region_index.overlap(lo, hi))
+        self.refresh_stats(full=False, trids=sorted(trids))
+
+    def set_follow(self, follow):
+        """
+        Turns auto-scrolling to the newest live events on or off.
+
+        Args:
+            follow (bool): True to keep the newest events in view.
+        """
+        self.follow = follow
+        if follow and self.stream is not None:
+            self.stream_updated()
+
+    def view_window(self):
+        """
+        Gets the time range of the view and the width of one pixel.
+
+        Returns:
+            tuple: Start time, stop time and seconds per pixel.
+        """
+        vb: ViewBox = self.getViewBox()
+        lo, hi = vb.viewRange()[0]
+        pixel_width = vb.viewPixelSize()[0]
+        if not pixel_width > 0:
+            pixel_width = (hi - lo) / 1000
+        return lo, hi, pixel_width
+
+    def update_trace(self, trace:TraceItem, window=None):
+        """
+        Loads the level of detail of a trace that matches the view.
+
+        Args:
+            trace (TraceItem): The trace to update.
+            window (tuple): Precomputed result of view_window.
+        """
+        lo, hi, pixel_width = window or self.view_window()
+        selected = self.lod.select(trace.tid, lo, hi, pixel_width, trace.loaded)
+        if selected is not None:
+            x, y, trace.loaded = selected
+            trace.setData(x=x, y=y)
+
+    def visible_ids(self):
+        """
+        Gets the store ids of the visible traces.
+
+        Returns:
+            list: Trace ids.
+        """
+        return [trace["id"] for trace in self.traces.values() if trace["trace"].isVisible()]
+
+    def show_density(self, window=None):
+        """
+        Hides the trace symbols and draws the visible points as a density image.
+
+        Args:
+            window (tuple): Precomputed result of view_window.
+        """
+        lo, hi, _ = window or self.view_window()
+        vb: ViewBox = self.getViewBox()
+        ylo, yhi = vb.viewRange()[1]
+        rect = vb.boundingRect()
+        shape = (rect.width() / self.density_bin_size, rect.height() / self.density_bin_size)
+
+        trace_colors = None
+        if self.style_mode == "color":
+            trace_colors = {trace["id"]: QColor(trace["color"]).getRgbF()[:3]
+                            for trace in self.traces.values()}
+        image = density_image(self.store, self.visible_ids(), (lo, hi), (ylo, yhi), shape, trace_colors)
+
+        self.clear_traces()
+        self.clear_merged()
+        self.density_item.setImage(image, autoLevels=False)
+        self.density_item.setRect(QRectF(lo, ylo, hi - lo, yhi - ylo))
+        self.density_item.show()
+
+    def uses_density(self, window):
+        """
+        Decides whether the view is drawn as a density image.
+
+        Args:
+            window (tuple): Result of view_window.
+
+        Returns:
+            bool: True for the density image, False for trace symbols.
+        """
+        if self.render_mode != "auto":
+            return self.render_mode == "density"
+        return count_visible(self.store, self.visible_ids(), window[:2]) > self.density_threshold
+
+    def clear_traces(self):
+        """Empties the per-trace items while another render path draws the points."""
+        for trace in self.traces.values():
+            if trace["trace"].loaded is not None:
+                trace["trace"].loaded = None
+                trace["trace"].setData(x=[], y=[])
+
+    def clear_merged(self):
+        """Empties and hides the merged scatter item."""
+        if self.merged_ids:
+            self.merged_parts.clear()
+            self.merged_ids = []
+            self.merged_item.clear()
+        self.merged_item.hide()
+
+    def trace_brush(self, color):
+        """
+        Returns the shared brush of a color.
+
+        Args:
+            color (str): Brush color.
+
+        Returns:
+            QBrush: The cached brush.
+        """
+        return self.registry.brush(color)
+
+    def merged_brushes(self):
+        """
+        Gets the brush of each trace in the merged item for the current style.
+
+        Returns:
+            list: One brush per merged trace.
+        """
+        if self.style_mode == "contrast":
+            return [self.trace_brush("white")] * len(self.merged_ids)
+        names = self.store.names
+        return [self.trace_brush(self.traces[names[tid]]["color"]) for tid in self.merged_ids]
+
+    def update_merged(self, window):
+        """
+        Draws every visible trace through the single merged scatter item.
+
+        The item is only rebuilt, with one setData, when a trace's level of
+        detail or the set of visible traces changed.
+
+        Args:
+            window (tuple): Result of view_window.
+        """
+        lo, hi, pixel_width = window
+        tids = self.visible_ids()
+        changed = tids != self.merged_ids
+        for tid in tids:
+            part = self.merged_parts.get(tid)
+            selected = self.lod.select(tid, lo, hi, pixel_width, None if part is None else part[2])
+            if selected is not None:
+                self.merged_parts[tid] = selected
+                changed = True
+
+        if changed:
+            self.merged_ids = tids
+            if tids:
+                x = np.concatenate([self.merged_parts[tid][0] for tid in tids])
+                y = np.concatenate([self.merged_parts[tid][1] for tid in tids])
+            else:
+                x = y = np.empty(0)
+            lengths = [len(self.merged_parts[tid][0]) for tid in tids]
+            self.merged_item.set_groups(x, y, lengths, self.merged_brushes())
+            self.merged_item.setOpacity(.5 if self.style_mode == "contrast" else 1)
+        self.merged_item.show()
+
+    @profiled("update_view")
+    def update_view(self):
+        """Redraws the view after a range change as density, merged or per-trace level of detail."""
+        if self.pending_regions or self.live_regions:
+            self.coalescer.post("materialize", self.materialize_view)
+        window = self.view_window()
+        if self.uses_density(window):
+            self.show_density(window)
+            return
+        self.density_item.hide()
+        if self.merged:
+            self.clear_traces()
+            self.update_merged(window)
+            return
+        self.clear_merged()
+        for entry in self.traces.values():
+            trace:TraceItem = entry["trace"]
+            if trace.isVisible():
+                self.style_trace(entry)
+                self.update_trace(trace, window)
+
+    def set_merged(self, merged):
+        """
+        Switches between one plot item per trace and a single merged scatter item.
+
+        Args:
+            merged (bool): True to draw all traces through one item.
+        """
+        self.merged = merged
+        self.update_view()
+
+    def scatter_mode(self):
+        """Always draws traces as individual symbols."""
+        self.render_mode = "scatter"
+        self.update_view()
+
+    def density_mode(self):
+        """Always draws traces as a density image."""
+        self.render_mode = "density"
+        self.update_view()
+
+    def auto_render_mode(self):
+        """Draws a density image only when the view holds more points than density_threshold."""
+        self.render_mode = "auto"
+        self.update_view()
+
+    def style_trace(self, entry):
+        """
+        Applies the current style mode to one per-trace item, if it is not styled so yet.
+
+        Args:
+            entry (dict): The trace's entry in traces.
+        """
+        if entry["style"] == self.style_mode:
+            return
+        entry["style"] = self.style_mode
+        trace:PlotDataItem = entry["trace"]
+        if self.style_mode == "contrast":
+            trace.setSymbolBrush(self.trace_brush("white"))
+            trace.setOpacity(.5)
+        else:
+            trace.setSymbolBrush(self.trace_brush(entry["color"]))
+            trace.setOpacity(1)
+
+    def restyle(self):
+        """
+        Applies the current style mode to whichever render path is shown.
+
+        Per-trace items that are hidden or not drawn keep their old style
+        until update_view draws them again.
+        """
+        if self.density_item.isVisible():
+            self.show_density()
+            return
+        if self.merged_item.isVisible():
+            self.merged_item.set_group_brushes(self.merged_brushes())
+            self.merged_item.setOpacity(.5 if self.style_mode == "contrast" else 1)
+            return
+        for entry in self.traces.values():
+            if entry["trace"].isVisible():
+                self.style_trace(entry)
+
     def contrast_mode(self):
         """Switches to contrast mode for traces."""
-        for key in self.traces.keys():
-            trace:PlotDataItem = self.traces[key]["trace"]
-            trace.setSymbolBrush("white")
-            trace.setOpacity(.5)
+        self.style_mode = "contrast"
+        self.restyle()
     
     def color_mode(self):
         """Switches to color mode for traces."""
-        for key in self.traces.keys():
-            trace:PlotDataItem = self.traces[key]["trace"]
-            trace.setSymbolBrush(colors[self.traces[key]["i"]])
-            trace.setOpacity(1)
+        self.style_mode = "color"
+        self.restyle()
 
-    def hide_trace(self,trace:PlotDataItem):
+    def hide_trace(self,trace:TraceItem):
         """
         Toggles the visibility of a trace.
 
         Args:
-            trace (PlotDataItem): The trace to toggle.
+            trace (TraceItem): The trace to toggle.
+        """
+        self.trace_table.set_visible([self.store.names[trace.tid]], not trace.isVisible())
+
+    def set_traces_visible(self, shown, hidden):
         """
-        trace.setVisible(not trace.isVisible())
+        Shows some traces and hides others, redrawing once.
+
+        Args:
+            shown (list): Names of the traces to show.
+            hidden (list): Names of the traces to hide.
+        """
+        for names, visible in ((shown, True), (hidden, False)):
+            for name in names:
+                trace = self.traces.get(name)
+                if trace is not None:
+                    trace["trace"].setVisible(visible)
+        self.update_view()
 
     def get_coords(self):
         """
@@ -149,59 +657,240 @@ class ScatterPlot(PlotWidget):
             mouse_point = self.getViewBox().mapSceneToView(pos)
             return mouse_point
     
-    def near_mouse_table(self):
-        """Populates the near table with points close to the mouse cursor."""
-        vb: ViewBox = self.getViewBox()
-        view_range = vb.getState()["viewRange"]
-        xrange, yrange = view_range
-        xwidth = xrange[1] - xrange[0]
-        ywidth = yrange[1] - yrange[0]
+    def set_stream_capacity(self, capacity):
+        """
+        Sets how many points every live trace keeps, from the next stream on.
 
-        self.near_table.reset_table()
-        mouse_point = self.get_coords()
-        if mouse_point:
-            for key in self.traces.keys():
-                if self.traces[key]["trace"].isVisible():
+        Args:
+            capacity (int): Number of points kept per trace.
+        """
+        self.stream_capacity = capacity
 
-                    color = colors[self.traces[key]["i"]]
-                    name = str(self.traces[key]["i"]).zfill(4)
+    def set_near_count(self, count):
+        """
+        Sets how many points the near table shows at most.
 
-                    x = mouse_point.x()
-                    y = mouse_point.y()
+        Args:
+            count (int): Maximum number of nearest points.
+        """
+        self.near_count = count
 
-                    xvals = np.array(self.traces[key]["x"])
-                    xmask = (np.abs(x-xvals)<xwidth/10)&(np.abs(x+xvals)>xwidth/10)
+    def set_near_radius(self, radius):
+        """
+        Sets the search radius of the near table lookup.
 
-                    yvals = np.array(self.traces[key]["y"])
-                    ymask = (np.abs(y-yvals)<ywidth/10)&(np.abs(y+yvals)>ywidth/10)
+        Args:
+            radius (float): Radius around the cursor in pixels.
+        """
+        self.near_radius = radius
 
-                    
-                    mask = xmask & ymask
-                
-                    x_n_range = xvals[mask].tolist()
-                    y_n_range = yvals[mask].tolist()
+    @profiled("near_mouse_table")
+    def near_mouse_table(self):
+        """Looks up the points nearest to the mouse cursor on a worker, replacing any pending lookup."""
+        vb: ViewBox = self.getViewBox()
 
-                    for i in range(len(x_n_range)):
-                        self.near_table.new_row(color,name,x_n_range[i],y_n_range[i])
+        self.workers.cancel("near")
+        mouse_point = self.get_coords()
+        if not mouse_point:
+            self.near_table.reset_table()
+            return
+        store, versions = self.store, self.store.versions.copy()
+        self.workers.submit(self.near_index.query, mouse_point.x(), mouse_point.y(),
+                            vb.viewPixelSize(), self.near_index.snapshot(self.visible_ids()),
+                            self.near_count, self.near_radius,
+                            vb.viewRange()[0], key="near",
+                            callback=lambda result: self.show_near(result, store, versions))
+
+    @profiled("show_near")
+    def show_near(self, result, store=None, versions=None):
+        """
+        Fills the near table with a finished near lookup.
+
+        A lookup over traces that changed in place since it was submitted,
+        such as a live ring that wrapped, is dropped and looked up again.
+
+        Args:
+            result (tuple): Trace ids, times, values and distances from NearestIndex.query.
+            store: The store the lookup searched.
+            versions (np.ndarray): Trace versions when the lookup was submitted.
+        """
+        ids, xs, ys, _ = result
+        if store is not None and store is not self.store:
+            return
+        if versions is not None and len(ids):
+            tids = np.unique(ids)
+            if (self.store.versions[tids] != versions[tids]).any():
+                self.coalescer.post("near", self.near_mouse_table)
+                return
+        trace_colors = [self.traces[name]["color"] for name in self.store.names]
+        self.near_table.set_points(ids, xs, ys, self.store.names, trace_colors)
     
     def _time_selection(self,start, stop):
         if start > stop:
             start, stop = stop, start
-        
-        start_string = datetime.fromtimestamp(round(start,3)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
-        stop_string = datetime.fromtimestamp(round(stop,3)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
         trid = self.time_region_next_id + 0
         
-        lr = TimeRegion((start, stop),trid)
-        lr.sigRegionChanged.connect(self.change_time_region)
-        
+        self.time_regions[trid] = SelectionRecord()
+        self.region_index.set(trid, start, stop)
+        self.time_region_next_id += 1
+
+        self.time_region_added.emit(start,stop,trid)
+        self._materialize(trid)
+        self.update_time_stats(trid)
 
-        self.time_region_added.emit(start_string,stop_string,trid)
-        lr.clicked.connect(lambda: self.time_selections.select_row_from_time_id(trid))
+    def _new_region_item(self, values, trid):
+        lr = TimeRegion(values,trid)
+        lr.sigRegionChanged.connect(lambda: self.coalescer.post(("tr", lr.trid), self.region_moved, lr.trid))
+        lr.sigRegionChangeFinished.connect(lambda: self.region_finished(lr.trid))
+        lr.clicked.connect(self.time_selections.select_row_from_time_id)
+        profiler.watch(lr.sigRegionChanged, "TimeRegion.sigRegionChanged")
+        return lr
+
+    def _region_item(self, trid):
+        lr = self.region_pool.take(self.region_index.bounds[trid], trid)
         self.addItem(lr)
+        return lr
 
-        self.time_regions[trid] = {"tr": lr,"vl":dict(),"vc":0}
-        self.time_region_next_id += 1
+    def _materialize(self, trid):
+        """
+        Creates the graphics items of a time selection and its ROIs if they do not exist yet.
+
+        Args:
+            trid (int): The ID of the time region.
+
+        Returns:
+            TimeRegion: The region item.
+        """
+        record = self.time_regions[trid]
+        if record.region is None:
+            record.region = self._region_item(trid)
+            self.pending_regions.discard(trid)
+            self.live_regions.add(trid)
+        for roi_id, (bottom, top) in self.roi_arrays.bounds(trid).items():
+            if roi_id not in record.rois:
+                self._roi_item(trid, roi_id, top, bottom)
+        return record.region
+
+    def _release_roi(self, roi:BoundROI):
+        self.removeItem(roi)
+        roi.detach()
+        self.roi_pool.release(roi)
+
+    def _release(self, trid):
+        """
+        Takes the graphics items of a time selection out of the scene and back to the pools.
+
+        The selection is kept as plain numbers in the interval index and the
+        ROI arrays until it is materialized again.
+
+        Args:
+            trid (int): The ID of the time region.
+        """
+        record = self.time_regions[trid]
+        for roi in record.rois.values():
+            self._release_roi(roi)
+        record.rois = dict()
+        self.removeItem(record.region)
+        self.region_pool.release(record.region)
+        record.region = None
+        self.live_regions.discard(trid)
+        self.pending_regions.add(trid)
+
+    @profiled("materialize_view")
+    def materialize_view(self):
+        """
+        Keeps graphics items only for the selections in or near the view.
+
+        Selections overlapping the view widened by cull_margin view widths on
+        each side get items, as many as fit in a frame. Items of selections
+        beyond twice that margin are released, so panning back and forth
+        near an edge does not churn them. The selection shown in the tables
+        keeps its items.
+        """
+        lo, hi = self.getViewBox().viewRange()[0]
+        margin = (hi - lo) * self.cull_margin
+        keep = (self.time_selections.id_from_selection(), self.roi_table.time_id)
+        for trid in [trid for trid in self.live_regions if trid not in keep]:
+            start, stop = self.region_index.bounds[trid]
+            if stop < lo - 2 * margin or start > hi + 2 * margin:
+                self._release(trid)
+        pending = [trid for trid in self.region_index.overlap(lo - margin, hi + margin)
+                   if trid in self.pending_regions]
+        deadline = time.perf_counter() + self.materialize_budget
+        for trid in pending:
+            if time.perf_counter() > deadline:
+                self.coalescer.post("materialize", self.materialize_view)
+                return
+            self._materialize(trid)
+
+    def add_selections(self, starts, stops, owners, bottoms, tops):
+        """
+        Adds many time selections and their ROIs in one batch.
+
+        Records, table rows, the interval index and quick statistics are
+        filled for all selections at once. Graphics items are only created
+        for selections in view, a batch per frame, and for the others when
+        they are first selected or scrolled into view.
+
+        Args:
+            starts (np.ndarray): Start time of every selection.
+            stops (np.ndarray): Stop time of every selection.
+            owners (np.ndarray): Index of the selection each ROI belongs to.
+            bottoms (np.ndarray): Lower bound of every ROI.
+            tops (np.ndarray): Upper bound of every ROI.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        starts, stops = np.minimum(starts, stops), np.maximum(starts, stops)
+        bottoms, tops = np.minimum(bottoms, tops), np.maximum(bottoms, tops)
+        first = self.time_region_next_id
+        trids = list(range(first, first + len(starts)))
+        self.time_region_next_id += len(starts)
+
+        # ROIs are numbered per selection in file order
+        owners = np.asarray(owners, dtype=np.int64)
+        counts = np.bincount(owners, minlength=len(starts))
+        roi_ids = np.empty(len(owners), dtype=np.int64)
+        roi_ids[np.argsort(owners, kind="stable")] = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        roi_trids = owners + first
+        self.roi_arrays.add(roi_trids, roi_ids, bottoms, tops)
+
+        stats = self.stats.compute_many(starts, stops)
+        for trid, start, stop, count, st in zip(trids, starts.tolist(), stops.tolist(), counts.tolist(), stats):
+            record = self.time_regions[trid] = SelectionRecord(count)
+            record.stats = st
+            self.region_index.set(trid, start, stop)
+        self.pending_regions.update(trids)
+
+        self.time_regions_added.emit(starts.tolist(), stops.tolist(), trids, [self._stat_values(st) for st in stats])
+        self.roi_table.insert_rois(roi_trids.tolist(), roi_ids.tolist(), bottoms.tolist(), tops.tolist())
+        self.coalescer.post("materialize", self.materialize_view)
+        return trids
+
+    def load_selections(self, path):
+        """
+        Adds the time selections and ROIs saved in a selection file.
+
+        Args:
+            path (str): JSON or binary selection file.
+        """
+        self.add_selections(*read_selections(path))
+
+    def save_selections(self, path):
+        """
+        Saves every time selection and its ROIs.
+
+        Args:
+            path (str): File to write, JSON when it ends in .json, binary otherwise.
+        """
+        self.coalescer.flush()
+        trids = np.array(sorted(self.time_regions.keys()), dtype=np.int64)
+        bounds = np.array([self.region_index.bounds[trid] for trid in trids.tolist()], dtype=np.float64).reshape(-1, 2)
+        owners, ids, bottoms, tops = self.roi_arrays.columns()
+        order = np.lexsort((ids, owners))
+        write_selections(path, bounds[:, 0], bounds[:, 1], np.searchsorted(trids, owners[order]),
+                         bottoms[order], tops[order])
 
     def add_time_selection(self):
         """Adds a time selection region."""
@@ -217,6 +906,7 @@ class ScatterPlot(PlotWidget):
                 self._time_selection(start, stop)
                 self.time_start = None
     
+    @profiled("change_time_region")
     def change_time_region(self, linear_region:LinearRegionItem):
         """
         Handles changes to a time region.
@@ -224,20 +914,212 @@ class ScatterPlot(PlotWidget):
         Args:
             linear_region (LinearRegionItem): The changed region.
         """
-        key = None
-        for k in self.time_regions.keys():
-            if linear_region is self.time_regions[k]["tr"]:
-                key = k
-        
-        if key is None:
+        key = linear_region.trid
+        if key not in self.time_regions:
             return
         
         start,stop = linear_region.getRegion()
+        self.region_index.set(key, start, stop)
+        self.time_region_changed.emit(start, stop, key)
+
+    @profiled("region_moved")
+    def region_moved(self, trid):
+        """
+        Applies the latest position of a dragged time region, once per frame.
+
+        Args:
+            trid (int): The ID of the time region.
+        """
+        record = self.time_regions.get(trid)
+        if record is None or record.region is None:
+            return
+        self.change_time_region(record.region)
+        self.update_time_stats(trid, full=False)
+
+    @profiled("region_finished")
+    def region_finished(self, trid):
+        """
+        Applies the final position of a time region when its drag ends.
+
+        Args:
+            trid (int): The ID of the time region.
+        """
+        self.coalescer.discard(("tr", trid))
+        record = self.time_regions.get(trid)
+        if record is None or record.region is None:
+            return
+        self.change_time_region(record.region)
+        self.update_time_stats(trid)
+
+    def roi_finished(self, trid, roi_id):
+        """
+        Applies the final shape of an ROI when its drag ends.
+
+        Args:
+            trid (int): The ID of the associated time region.
+            roi_id (int): The ID of the ROI.
+        """
+        self.update_roi_stats(trid, roi_id)
+
+    def select_region_under_cursor(self):
+        """Selects the narrowest time selection covering the mouse cursor."""
+        coords = self.get_coords()
+        if not coords:
+            return
+        self.coalescer.flush()
+        trid = self.region_index.innermost(coords.x())
+        if trid is not None:
+            self.time_selections.select_row_from_time_id(trid)
+
+    def replace_selections(self, sources, starts, stops):
+        """
+        Replaces time selections with new ones in one batch.
+
+        Every new selection gets copies of the ROIs of the selections it
+        replaces, once per distinct pair of bounds, so merging the parts of
+        a split selection does not stack duplicate ROIs. The new selections go through add_selections, so the
+        records, table rows and quick statistics are filled with one
+        insert and their items are created per frame, and the replaced
+        selections leave the tables in one removal.
+
+        Args:
+            sources (list): For every new selection, the IDs of the time regions it replaces.
+            starts: Start time of every new selection.
+            stops: Stop time of every new selection.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        self.coalescer.flush()
+        rows = [np.empty(0, dtype=np.int64)]
+        owners = [np.empty(0, dtype=np.int64)]
+        for n, trids in enumerate(sources):
+            for trid in trids:
+                rows.append(self.roi_arrays.rows(trid))
+                owners.append(np.full(len(rows[-1]), n, dtype=np.int64))
+        rows = np.concatenate(rows)
+        rois = np.column_stack((np.concatenate(owners), self.roi_arrays.bottoms[rows], self.roi_arrays.tops[rows]))
+        _, first = np.unique(rois, axis=0, return_index=True)
+        rois = rois[np.sort(first)]
+        trids = self.add_selections(np.asarray(starts, dtype=np.float64), np.asarray(stops, dtype=np.float64),
+                                    rois[:, 0].astype(np.int64), rois[:, 1], rois[:, 2])
+        self.time_selections.delete_time_ids(sorted({trid for group in sources for trid in group}))
+        return trids
+
+    def split_selections(self, cuts):
+        """
+        Splits time selections at given times, all in one batch.
+
+        Args:
+            cuts (dict): Maps the ID of a time region to the times to cut it at.
+                Times outside the selection are ignored.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        self.coalescer.flush()
+        sources, starts, stops = [], [], []
+        for trid, times in cuts.items():
+            if trid not in self.region_index:
+                continue
+            left, right = self.region_index.bounds[trid]
+            times = np.unique(np.asarray(times, dtype=np.float64))
+            times = times[(times > left) & (times < right)]
+            if not len(times):
+                continue
+            edges = np.concatenate(([left], times, [right]))
+            sources.extend([[trid]] * (len(times) + 1))
+            starts.append(edges[:-1])
+            stops.append(edges[1:])
+        if not sources:
+            return []
+        return self.replace_selections(sources, np.concatenate(starts), np.concatenate(stops))
+
+    def split_even(self, trids, parts):
+        """
+        Splits time selections into equal parts.
+
+        Args:
+            trids (list): IDs of the time regions.
+            parts (int): Number of parts per selection.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        cuts = dict()
+        for trid in trids:
+            left, right = self.region_index.bounds[trid]
+            cuts[trid] = np.linspace(left, right, parts + 1)[1:-1]
+        return self.split_selections(cuts)
+
+    def split_at_times(self, trids, times):
+        """
+        Splits time selections at timestamps.
+
+        Args:
+            trids (list): IDs of the time regions.
+            times: Epoch seconds to cut at, each only splits the selections containing it.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        return self.split_selections({trid: times for trid in trids})
+
+    def split_at_gaps(self, trids, gap):
+        """
+        Splits time selections in the middle of every gap in the visible traces' points.
+
+        Args:
+            trids (list): IDs of the time regions.
+            gap (float): Shortest time in seconds without points that splits a selection.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        tids = self.visible_ids()
+        cuts = dict()
+        for trid in trids:
+            left, right = self.region_index.bounds[trid]
+            views = self.store.slice_by_time(left, right, tids)
+            times = np.sort(np.concatenate([np.empty(0)] + [times for times, _ in views.values()]))
+            wide = np.flatnonzero(np.diff(times) > gap)
+            cuts[trid] = (times[wide] + times[wide + 1]) / 2
+        return self.split_selections(cuts)
+
+    def merge_time_selections(self, trids):
+        """
+        Replaces time selections with one selection spanning them all, keeping every ROI.
 
-        start_string = datetime.fromtimestamp(round(start,3)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
-        stop_string = datetime.fromtimestamp(round(stop,3)).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
-                
-        self.time_region_changed.emit(start_string, stop_string, key)
+        Args:
+            trids (list): IDs of the time regions, at least two.
+
+        Returns:
+            list: ID of the new time region, empty when fewer than two were given.
+        """
+        trids = [trid for trid in trids if trid in self.region_index]
+        if len(trids) < 2:
+            return []
+        bounds = np.array([self.region_index.bounds[trid] for trid in trids])
+        return self.replace_selections([trids], [bounds[:, 0].min()], [bounds[:, 1].max()])
+
+    def merge_selections(self, gap=0.0):
+        """
+        Replaces every group of overlapping or adjacent time selections with one spanning selection.
+
+        The merged selection keeps the ROIs of all the selections it replaces.
+
+        Args:
+            gap (float): Largest distance in seconds between selections that still merges them.
+
+        Returns:
+            list: IDs of the new time regions.
+        """
+        self.coalescer.flush()
+        groups = self.region_index.merge_groups(gap)
+        if not groups:
+            return []
+        return self.replace_selections([trids for trids, _, _ in groups],
+                                       [start for _, start, _ in groups], [stop for _, _, stop in groups])
 
     def remove_time_selection(self, trid):
         """
@@ -246,36 +1128,86 @@ class ScatterPlot(PlotWidget):
         Args:
             trid (int): The ID of the time region to remove.
         """
-        item  = self.time_regions.pop(trid)
-        region = item["tr"]
-        self.removeItem(region)
-        for roi in item["vl"].values():
-            self.removeItem(roi)
-        self.roi_table.clearContents()
-        self.roi_table.setRowCount(0)
+        if trid in self.live_regions:
+            self._release(trid)
+        self.time_regions.pop(trid)
+        self.roi_arrays.remove(trid)
+        self.region_index.remove(trid)
+        self.pending_regions.discard(trid)
+        if self.shown_stats is not None and self.shown_stats[0] == trid:
+            self.shown_stats = None
+            self.stats_table.clear_stats()
+        if self.roi_table.time_id == trid:
+            self.roi_table.show_time_id(None)
     
     def _roi(self, high,low, trid, region):
-        if low>high:
-            low, high = high, low
-        count = self.time_regions[trid]["vc"]
+        self._add_rois(trid, [low], [high])
+
+    def _add_rois(self, trid, bottoms, tops):
+        """
+        Adds ROIs to a time selection, with items when the selection has them.
+
+        Args:
+            trid (int): The ID of the time region.
+            bottoms: Lower bound of every ROI.
+            tops: Upper bound of every ROI.
+        """
+        bottoms, tops = np.minimum(bottoms, tops), np.maximum(bottoms, tops)
+        record = self.time_regions[trid]
+        roi_ids = list(range(record.next_roi, record.next_roi + len(bottoms)))
+        record.next_roi += len(roi_ids)
+        self.roi_arrays.add([trid] * len(roi_ids), roi_ids, bottoms, tops)
+        self.roi_table.insert_rois([trid] * len(roi_ids), roi_ids, bottoms.tolist(), tops.tolist())
+        for roi_id, bottom, top in zip(roi_ids, bottoms.tolist(), tops.tolist()):
+            if record.region is not None:
+                self._roi_item(trid, roi_id, top, bottom)
+            self.update_roi_stats(trid, roi_id)
+
+    def _new_roi_item(self, high, low, region, count):
         v_select = BoundROI(high, low, region, count)
-        v_select.roi_changed.connect(self.show_roi)
-        
+        v_select.roi_changed.connect(lambda: self.roi_moved(v_select))
+        v_select.sigRegionChangeFinished.connect(lambda: self.roi_finished(v_select.region.trid, v_select.roi_id))
+        v_select.clicked.connect(lambda: self.roi_clicked(v_select))
+        profiler.watch(v_select.roi_changed, "BoundROI.roi_changed")
+        return v_select
+
+    def _roi_item(self, trid, count, high, low):
+        record = self.time_regions[trid]
+        v_select = self.roi_pool.take(high, low, record.region, count)
         self.addItem(v_select)
-        
-        
-        self.time_regions[trid]["vl"][count] = v_select
-        self.time_regions[trid]["vc"]+=1
-        
-        v_select.clicked.connect(lambda: self.roi_table.select_row_from_roi_id(count))
-        v_select.clicked.connect(lambda: self.time_selections.select_row_from_time_id(trid))
-        v_select.roi_changed.emit()
+        record.rois[count] = v_select
+        return v_select
+
+    def roi_moved(self, roi:BoundROI):
+        """
+        Stores the bounds of a moved ROI and schedules its statistics update, once per frame.
+
+        Args:
+            roi (BoundROI): The moved ROI.
+        """
+        if roi.region is None:
+            return
+        trid = roi.region.trid
+        self.roi_arrays.set(trid, roi.roi_id, roi.bottom, roi.top)
+        self.coalescer.post(("roi", trid, roi.roi_id), self.update_roi_stats, trid, roi.roi_id, False)
+
+    def roi_clicked(self, roi:BoundROI):
+        """
+        Selects a clicked ROI and its time selection in the tables and shows its statistics.
+
+        Args:
+            roi (BoundROI): The clicked ROI.
+        """
+        trid = roi.region.trid
+        self.roi_table.select_row_from_roi_id(roi.roi_id)
+        self.time_selections.select_row_from_time_id(trid)
+        self.show_stats(trid, roi.roi_id)
 
     def add_roi(self):
         """Adds a vertical ROI within a time region."""
         trid = self.time_selections.id_from_selection()
         if trid is not None:
-            region = self.time_regions[trid]["tr"]
+            region = self._materialize(trid)
         else:
             return
 
@@ -304,108 +1236,158 @@ class ScatterPlot(PlotWidget):
             trid (int): The ID of the associated time region.
             roi_id (int): The ID of the ROI to remove.
         """
-        roi  = self.time_regions[trid]["vl"].pop(roi_id)
-        self.removeItem(roi)
+        record = self.time_regions[trid]
+        record.roi_stats.pop(roi_id, None)
+        if self.shown_stats == (trid, roi_id):
+            self.show_stats(trid)
+        self.roi_arrays.remove(trid, roi_id)
+        roi = record.rois.pop(roi_id, None)
+        if roi is not None:
+            self._release_roi(roi)
 
+    @profiled("show_roi")
     def show_roi(self):
         """Displays ROIs for the selected time region."""
         trid = self.time_selections.id_from_selection()
         if trid is None:
             return
-        vert_dict = self.time_regions[trid]["vl"]
-        self.roi_table.clearContents()
-        self.roi_table.setRowCount(0)
-        if vert_dict:
-            for k in vert_dict.keys():
-                roi: BoundROI = vert_dict[k]
-                y = roi.pos()[1]
-                dy = roi.size()[1]
-                y2 = y+dy
-                self.roi_table.insert_roi(round(y,3),round(y2,3), trid, k)
-    
-    def setview_time_select(self, trid):
+        self._materialize(trid)
+        self.roi_table.show_time_id(trid)
+        record = self.time_regions[trid]
+        for roi_id in self.roi_arrays.bounds(trid):
+            if roi_id not in record.roi_stats:
+                self.update_roi_stats(trid, roi_id)
+
+    def _stat_values(self, stats):
+        total = stats["total"]
+        return (total["count"], total["rate"], total["mean"], self.stats.median(stats))
+
+    @profiled("update_time_stats")
+    def update_time_stats(self, trid, full=True):
         """
-        Sets the view range of the plot.
+        Recomputes the statistics of one time selection.
+
+        While dragging only counts, rates and means are updated, from
+        binary searches and prefix sums. The full update at the end of a
+        drag adds medians and percentiles and also updates the ROIs bound
+        to the selection.
 
         Args:
-            top (float): Top boundary.
-            bottom (float): Bottom boundary.
-            left (float): Left boundary.
-            right (float): Right boundary.
+            trid (int): The ID of the time region.
+            full (bool): Also compute medians and percentiles.
         """
-        view_box = self.getViewBox()
-        region = self.time_regions[trid]["tr"]
-        left, right = region.getRegion()
-        top_sel = 0
-        bottom_sel = 1e10
-        for roi in self.time_regions[trid]["vl"].values():
-            roi: BoundROI = roi
-            top_sel = max(top_sel, roi.top)
-            bottom_sel = min(bottom_sel, roi.bottom)
-             
-        view_box.setRange(xRange=(left, right), yRange=(bottom_sel, top_sel))
+        record = self.time_regions.get(trid)
+        if record is None:
+            return
+        if full:
+            self.coalescer.discard(("tr", trid))
+        left, right = self.region_index.bounds[trid]
+        record.stats = self.stats.compute(left, right, full=full)
+        self.time_selections.update_stats(trid, self._stat_values(record.stats))
+        if self.shown_stats == (trid, None):
+            self.show_stats(trid)
+        if full:
+            for roi_id in self.roi_arrays.bounds(trid):
+                self.update_roi_stats(trid, roi_id)
 
-    def setview_roi(self, trid, roi_id):
+    @profiled("update_roi_stats")
+    def update_roi_stats(self, trid, roi_id, full=True):
         """
-        Sets the view range of the plot.
+        Recomputes the statistics of one ROI.
 
         Args:
-            top (float): Top boundary.
-            bottom (float): Bottom boundary.
-            left (float): Left boundary.
-            right (float): Right boundary.
+            trid (int): The ID of the associated time region.
+            roi_id (int): The ID of the ROI.
+            full (bool): Also compute medians and percentiles.
         """
-        view_box = self.getViewBox()
-        view_box = self.getViewBox()
-        region = self.time_regions[trid]["tr"]
-        left, right = region.getRegion()
-        roi = self.time_regions[trid]["vl"][roi_id]
-        top = roi.top
-        bottom = roi.bottom
-        if bottom>top:
-            top, bottom = bottom, top
-        
-        if left>right:
-            left, right = right, left
-        
-        view_box.setRange(xRange=(left, right), yRange=(bottom, top))
+        record = self.time_regions.get(trid)
+        if record is None:
+            return
+        bounds = self.roi_arrays.get(trid, roi_id)
+        if bounds is None:
+            return
+        if full:
+            self.coalescer.discard(("roi", trid, roi_id))
+        left, right = self.region_index.bounds[trid]
+        record.roi_stats[roi_id] = self.stats.compute(left, right, *bounds, full=full)
+        self.roi_table.update_table(*bounds, trid, roi_id)
+        self.roi_table.update_stats(trid, roi_id, self._stat_values(record.roi_stats[roi_id]))
+        if self.shown_stats == (trid, roi_id):
+            self.show_stats(trid, roi_id)
 
-    def split_selection(self):
-        """Splits the current selection."""
-        orig_trid = self.time_selections.id_from_selection()
-        if orig_trid is None:
+    def refresh_stats(self, full=True, trids=None):
+        """
+        Recomputes the statistics of selections after the traces changed.
+
+        Args:
+            full (bool): Also compute medians and percentiles.
+            trids (list): IDs of the time regions, every one when None.
+        """
+        for trid in list(self.time_regions.keys()) if trids is None else trids:
+            self.update_time_stats(trid, full)
+            if not full:
+                for roi_id in self.roi_arrays.bounds(trid):
+                    self.update_roi_stats(trid, roi_id, full)
+
+    @profiled("show_stats")
+    def show_stats(self, trid=None, roi_id=None):
+        """
+        Shows the per-trace statistics of a selection in the stats table.
+
+        Args:
+            trid (int): The ID of the time region, the selected one when None.
+            roi_id (int): The ID of an ROI of that region, None for the whole region.
+        """
+        selected = trid is None
+        if selected:
+            trid = self.time_selections.id_from_selection()
+        record = self.time_regions.get(trid)
+        if record is None:
             return
-        original = self.time_regions[orig_trid]
-        region = original["tr"]
-        left, right = region.getRegion()
-        start = left
-        stop = right - (right-left)/2
-        if start > stop:
-            start, stop = stop, start
-        trid = self.time_region_next_id + 0
-        
-        self._time_selection(start,stop)
-        new_region = self.time_regions[trid]["tr"]
-        for roi in original["vl"].values():
-            top, bottom = roi.top,roi.bottom
-            self._roi(top, bottom, trid, new_region)
-        
-        start = left + (right-left)/2
-        stop = right
-        if start > stop:
-            start, stop = stop, start
-        trid = self.time_region_next_id + 0
-        
-        self._time_selection(start,stop)
-        new_region = self.time_regions[trid]["tr"]
-        for roi in original["vl"].values():
-            top, bottom = roi.top,roi.bottom
-            self._roi(top, bottom, trid, new_region)
-        
-        self.time_selections.delete_row()
-        
+        if selected and record.stats is not None and "percentiles" not in record.stats:
+            # bulk loaded selections only have quick statistics until first selected
+            left, right = self.region_index.bounds[trid]
+            record.stats = self.stats.compute(left, right)
+            self.time_selections.update_stats(trid, self._stat_values(record.stats))
+        stats = record.stats if roi_id is None else record.roi_stats.get(roi_id)
+        if stats is None:
+            return
+        self.shown_stats = (trid, roi_id)
+        trace_colors = [self.traces[name]["color"] for name in self.store.names]
+        self.stats_table.set_percentiles(self.stats.percentiles)
+        self.stats_table.set_stats(stats, self.store.names, trace_colors)
+
+    def setview_time_select(self, trid):
+        """
+        Zooms to a time selection and the span of its ROIs.
 
+        Args:
+            trid (int): The ID of the time region.
+        """
+        left, right = self.region_index.bounds[trid]
+        extent = self.roi_arrays.extent(trid)
+        if extent is None:
+            self.getViewBox().setRange(xRange=(left, right))
+        else:
+            self.getViewBox().setRange(xRange=(left, right), yRange=extent)
 
+    def setview_roi(self, trid, roi_id):
+        """
+        Zooms to one ROI of a time selection.
 
+        Args:
+            trid (int): The ID of the associated time region.
+            roi_id (int): The ID of the ROI.
+        """
+        left, right = self.region_index.bounds[trid]
+        bottom, top = self.roi_arrays.get(trid, roi_id)
+        self.getViewBox().setRange(xRange=(left, right), yRange=(bottom, top))
 
+    def split_selection(self, parts=2):
+        """
+        Splits the selected time selections into equal parts, each with copies of its ROIs.
 
+        Args:
+            parts (int): Number of parts per selection.
+        """
+        self.split_even(self.time_selections.ids_from_selection(), parts)
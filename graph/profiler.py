@@ -0,0 +1,235 @@
+from PyQt6.QtCore import QObject
+from collections import defaultdict
+import functools
+import inspect
+import json
+import math
+import time
+
+LOG_MIN = -6
+BINS_PER_DECADE = 10
+BIN_COUNT = 7 * BINS_PER_DECADE + 1
+
+
+def bin_edges():
+    """
+    Gets the upper edge of every histogram bin.
+
+    Bins are log spaced, ten per decade, from 1 µs to 10 s. The last bin
+    also holds everything slower.
+
+    Returns:
+        list: Upper edges in seconds.
+    """
+    return [10 ** (LOG_MIN + (n + 1) / BINS_PER_DECADE) for n in range(BIN_COUNT)]
+
+
+class Phase:
+    """The call count, total, maximum and duration histogram of one timed phase."""
+
+    __slots__ = ("calls", "total", "max", "bins")
+
+    def __init__(self):
+        """Initializes an empty Phase."""
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bins = [0] * BIN_COUNT
+
+    def add(self, seconds):
+        """
+        Records one duration.
+
+        Args:
+            seconds (float): Duration of the call.
+        """
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        n = int((math.log10(seconds) - LOG_MIN) * BINS_PER_DECADE) if seconds > 0 else 0
+        self.bins[min(max(n, 0), BIN_COUNT - 1)] += 1
+
+    def percentile(self, q):
+        """
+        Estimates a percentile from the histogram.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Upper edge of the bin holding the percentile, in seconds.
+        """
+        if not self.calls:
+            return math.nan
+        rank = self.calls * q / 100
+        seen = 0
+        for n, count in enumerate(self.bins):
+            seen += count
+            if seen >= rank and count:
+                return min(10 ** (LOG_MIN + (n + 1) / BINS_PER_DECADE), self.max)
+        return self.max
+
+
+class Profiler(QObject):
+    """
+    Frame, slot and signal instrumentation for the plot and its tables.
+
+    Methods decorated with profiled record how long every call took under a
+    phase name, and watched signals count their emissions. Nothing is
+    recorded until the profiler is enabled, so the decorated hot paths only
+    pay one attribute check. Timings are inclusive: a phase calling another
+    timed phase counts the inner time in both.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initializes the Profiler.
+
+        Args:
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.enabled = False
+        self.phases = defaultdict(Phase)
+        self.signals = defaultdict(int)
+        self.started = time.perf_counter()
+        self.last_frame = None
+
+    def set_enabled(self, enabled):
+        """
+        Starts or stops recording.
+
+        Args:
+            enabled (bool): True to record.
+        """
+        self.enabled = enabled
+        self.last_frame = None
+
+    def reset(self):
+        """Forgets every recorded timing and signal count."""
+        self.phases.clear()
+        self.signals.clear()
+        self.started = time.perf_counter()
+        self.last_frame = None
+
+    def record(self, phase, seconds):
+        """
+        Records the duration of one call of a phase.
+
+        Args:
+            phase (str): Phase name.
+            seconds (float): Duration of the call.
+        """
+        if self.enabled:
+            self.phases[phase].add(seconds)
+
+    def frame(self):
+        """Records the time since the previous painted frame, ignoring idle gaps over a second."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame is not None and now - self.last_frame < 1.0:
+            self.phases["frame_interval"].add(now - self.last_frame)
+        self.last_frame = now
+
+    def count(self, name):
+        """
+        Counts one emission of a signal.
+
+        Args:
+            name (str): Signal name.
+        """
+        if self.enabled:
+            self.signals[name] += 1
+
+    def watch(self, signal, name):
+        """
+        Counts every emission of a signal while enabled.
+
+        Args:
+            signal: Bound pyqtSignal.
+            name (str): Name the emissions are counted under.
+        """
+        signal.connect(lambda *_: self.count(name))
+
+    def histograms(self):
+        """
+        Gets the duration histogram and summary of every phase.
+
+        Returns:
+            dict: Maps phase name to its calls, total, mean, p50, p95, p99
+            and max in seconds, the bin upper edges and the bin counts.
+        """
+        edges = bin_edges()
+        result = dict()
+        for name, phase in sorted(self.phases.items()):
+            result[name] = {"calls": phase.calls,
+                            "total": phase.total,
+                            "mean": phase.total / phase.calls if phase.calls else math.nan,
+                            "p50": phase.percentile(50),
+                            "p95": phase.percentile(95),
+                            "p99": phase.percentile(99),
+                            "max": phase.max,
+                            "edges": edges,
+                            "counts": list(phase.bins)}
+        return result
+
+    def rates(self):
+        """
+        Gets how often every watched signal fired.
+
+        Returns:
+            dict: Maps signal name to its count and emissions per second.
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {name: {"count": count, "per_second": count / elapsed} for name, count in sorted(self.signals.items())}
+
+    def dump(self, path):
+        """
+        Writes the phase histograms and signal counts as JSON.
+
+        Args:
+            path (str): File to write.
+        """
+        with open(path, "w") as f:
+            json.dump({"elapsed": time.perf_counter() - self.started,
+                       "phases": self.histograms(),
+                       "signals": self.rates()}, f, indent=2)
+
+
+profiler = Profiler()
+
+
+def profiled(phase):
+    """
+    Times every call of a function under a phase name while the profiler is enabled.
+
+    Like a plain slot, the wrapper drops extra signal arguments the
+    function does not take.
+
+    Args:
+        phase (str): Phase name.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(fn):
+        params = inspect.signature(fn).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in params):
+            limit = None
+        else:
+            limit = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            args = args[:limit]
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(phase, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,127 @@
+from PyQt6.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem, QAbstractItemView, QCheckBox, QToolButton,
+                             QLabel, QHBoxLayout, QVBoxLayout, QFileDialog, QMessageBox)
+from PyQt6.QtCore import QTimer
+
+from .profiler import Profiler, profiler
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.3f}"
+
+
+class ProfilerHUD(QWidget):
+    """
+    A live view of the profiler: frame rate, per-phase timings and signal rates.
+
+    Recording starts with the Record box and the view refreshes twice a
+    second while it does. Dump writes the full histograms as JSON.
+    """
+
+    def __init__(self, source: Profiler = profiler, parent=None):
+        """
+        Initializes the ProfilerHUD.
+
+        Args:
+            source (Profiler): The profiler to show.
+            parent: Parent widget (optional).
+        """
+        super().__init__(parent)
+        self.profiler = source
+        self.record = QCheckBox("Record")
+        self.record.setChecked(source.enabled)
+        self.record.toggled.connect(self.set_recording)
+        reset = QToolButton()
+        reset.setText("Reset")
+        reset.clicked.connect(self.reset)
+        dump = QToolButton()
+        dump.setText("Dump...")
+        dump.setToolTip("Save the timing histograms as JSON")
+        dump.clicked.connect(self.dump)
+        self.summary = QLabel()
+
+        self.phases = QTableWidget(0, 7)
+        self.phases.setHorizontalHeaderLabels(["Phase", "Calls", "Mean ms", "P50 ms", "P95 ms", "Max ms", "Total ms"])
+        self.signals = QTableWidget(0, 3)
+        self.signals.setHorizontalHeaderLabels(["Signal", "Count", "Per s"])
+        for table in (self.phases, self.signals):
+            table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.record)
+        controls.addWidget(reset)
+        controls.addWidget(dump)
+        controls.addStretch(1)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(controls)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.phases, 3)
+        layout.addWidget(self.signals, 2)
+        self.set_recording(source.enabled)
+
+    def set_recording(self, enabled):
+        """
+        Starts or stops recording and the periodic refresh.
+
+        Args:
+            enabled (bool): True to record.
+        """
+        self.profiler.set_enabled(enabled)
+        if enabled:
+            self.timer.start()
+        else:
+            self.timer.stop()
+        self.refresh()
+
+    def reset(self):
+        """Clears the recorded timings and counts."""
+        self.profiler.reset()
+        self.refresh()
+
+    def dump(self):
+        """Asks for a file name and writes the timing histograms to it."""
+        path, _ = QFileDialog.getSaveFileName(self, "Dump Profile", "", "JSON (*.json)")
+        if path:
+            try:
+                self.profiler.dump(path)
+            except OSError as error:
+                QMessageBox.warning(self, "Dump Profile", str(error))
+
+    def _fill(self, table, rows):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for row, cells in enumerate(rows):
+            for col, text in enumerate(cells):
+                item = table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    table.setItem(row, col, item)
+                item.setText(text)
+        table.resizeColumnsToContents()
+        table.setUpdatesEnabled(True)
+
+    def refresh(self):
+        """Shows the current timings and signal rates, slowest phases by total first."""
+        if not self.isVisible() and self.profiler.enabled:
+            return
+        histograms = self.profiler.histograms()
+        frames = histograms.get("frame_interval")
+        paint = histograms.get("paint")
+        summary = []
+        if frames and frames["mean"] > 0:
+            summary.append(f"{1 / frames['mean']:.1f} fps, worst frame {format_ms(frames['max'])} ms")
+        if paint:
+            summary.append(f"paint p95 {format_ms(paint['p95'])} ms")
+        self.summary.setText("   ".join(summary) if summary else ("recording" if self.profiler.enabled else "idle"))
+
+        phases = sorted(histograms.items(), key=lambda item: item[1]["total"], reverse=True)
+        self._fill(self.phases, [[name, str(h["calls"]), format_ms(h["mean"]), format_ms(h["p50"]),
+                                  format_ms(h["p95"]), format_ms(h["max"]), format_ms(h["total"])]
+                                 for name, h in phases])
+        rates = sorted(self.profiler.rates().items(), key=lambda item: item[1]["count"], reverse=True)
+        self._fill(self.signals, [[name, str(r["count"]), f"{r['per_second']:.1f}"] for name, r in rates])
@@ -0,0 +1,161 @@
+import numpy as np
+
+from .trace_store import TraceReader
+
+
+class RingTraceStore(TraceReader):
+    """
+    Fixed-capacity ring buffers holding the most recent points of every trace.
+
+    Offers the query interface of TraceStore. Each trace owns its own pair
+    of 2 * capacity slot arrays, allocated when the trace is added, and
+    every point is written twice, capacity apart, so the newest points are
+    always one contiguous slice: per-trace views stay copy-free while memory
+    stays bounded however long the stream runs.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        """
+        Initializes the RingTraceStore.
+
+        Args:
+            capacity (int): Number of points kept per trace.
+        """
+        self.capacity = capacity
+        self.time = []
+        self.value = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self.versions = np.zeros(0, dtype=np.int64)
+        self.names = []
+        self.ids = dict()
+        self.ranges = dict()
+
+    @property
+    def nbytes(self):
+        """int: Bytes held by the ring buffers."""
+        return sum(ring.nbytes for ring in self.time) + sum(ring.nbytes for ring in self.value)
+
+    def add_trace(self, name: str, time=None, value=None, capacity: int = 0):
+        """
+        Adds an empty ring for a trace and optionally fills it.
+
+        Args:
+            name (str): Unique trace name.
+            time (np.ndarray): Event times.
+            value (np.ndarray): Values aligned with time.
+            capacity (int): Ignored, every ring has the store's capacity.
+
+        Returns:
+            int: The id of the new trace.
+        """
+        if name in self.ids:
+            raise KeyError(f"trace {name!r} already exists")
+        tid = len(self.names)
+        self.time.append(np.empty(2 * self.capacity, dtype=np.float64))
+        self.value.append(np.empty(2 * self.capacity, dtype=np.float64))
+        self.names.append(name)
+        self.ids[name] = tid
+        self.counts = np.append(self.counts, 0)
+        self.lengths = np.append(self.lengths, 0)
+        self.versions = np.append(self.versions, 0)
+        if time is not None and len(time):
+            self.append(tid, time, value)
+        return tid
+
+    def _write(self, tid, first, time, value):
+        """
+        Writes points at consecutive logical positions of a ring.
+
+        Args:
+            tid (int): Trace id.
+            first (int): Logical position of the first point.
+            time (np.ndarray): Event times.
+            value (np.ndarray): Values aligned with time.
+        """
+        slots = (first + np.arange(len(time))) % self.capacity
+        for offset in (0, self.capacity):
+            self.time[tid][slots + offset] = time
+            self.value[tid][slots + offset] = value
+
+    def append(self, tid: int, time, value):
+        """
+        Appends points to a trace, dropping its oldest points when full.
+
+        Late points are merged into the stored tail, so times stay sorted.
+
+        Args:
+            tid (int): Trace id.
+            time (np.ndarray): Event times.
+            value (np.ndarray): Values aligned with time.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        value = np.asarray(value, dtype=np.float64)
+        if time.shape != value.shape:
+            raise ValueError("time and value must have the same length")
+        if not len(time):
+            return
+        if len(time) > 1 and (time[1:] < time[:-1]).any():
+            order = np.argsort(time, kind="stable")
+            time, value = time[order], value[order]
+        if len(time) > self.capacity:
+            time, value = time[-self.capacity:], value[-self.capacity:]
+
+        count = int(self.counts[tid])
+        stored = self.times(tid)
+        if len(stored) and time[0] < stored[-1]:
+            tail = int(np.searchsorted(stored, time[0], "right"))
+            time = np.concatenate((stored[tail:], time))
+            value = np.concatenate((self.values(tid)[tail:], value))
+            order = np.argsort(time, kind="stable")
+            time, value = time[order], value[order]
+            count -= len(stored) - tail
+        end = count + len(time)
+        keep = min(len(time), self.capacity)
+        self._write(tid, end - keep, time[-keep:], value[-keep:])
+
+        self.counts[tid] = end
+        self.lengths[tid] = min(end, self.capacity)
+        self.versions[tid] += 1
+
+    def update_values(self, tid: int, start: int, value):
+        """
+        Overwrites the values of a trace from a position on, keeping its times.
+
+        Args:
+            tid (int): Trace id.
+            start (int): Position in the trace's views of the first value.
+            value (np.ndarray): New values, up to the end of the trace.
+        """
+        value = np.asarray(value, dtype=np.float64)
+        first = int(self.counts[tid] - self.lengths[tid]) + start
+        slots = (first + np.arange(len(value))) % self.capacity
+        for offset in (0, self.capacity):
+            self.value[tid][slots + offset] = value
+        self.versions[tid] += 1
+
+    def times(self, tid: int):
+        """
+        Returns a view of a trace's buffered event times, oldest first.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: View into the ring.
+        """
+        start = (self.counts[tid] - self.lengths[tid]) % self.capacity
+        return self.time[tid][start:start+self.lengths[tid]]
+
+    def values(self, tid: int):
+        """
+        Returns a view of a trace's buffered values, oldest first.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: View into the ring.
+        """
+        start = (self.counts[tid] - self.lengths[tid]) % self.capacity
+        return self.value[tid][start:start+self.lengths[tid]]
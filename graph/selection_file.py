@@ -0,0 +1,74 @@
+import json
+import numpy as np
+
+MAGIC = b"QSEL0001"
+
+
+def write_selections(path, starts, stops, owners, bottoms, tops):
+    """
+    Saves time selections and their ROIs.
+
+    Paths ending in .json get a JSON document for interchange, anything
+    else the packed binary form: the 8 byte magic, little-endian uint64
+    selection and ROI counts, then the float64 starts and stops, the int64
+    owning selection index of every ROI and the float64 ROI bottoms and
+    tops.
+
+    Args:
+        path (str): File to write.
+        starts (np.ndarray): Start time of every selection.
+        stops (np.ndarray): Stop time of every selection.
+        owners (np.ndarray): Index of the selection each ROI belongs to.
+        bottoms (np.ndarray): Lower bound of every ROI.
+        tops (np.ndarray): Upper bound of every ROI.
+    """
+    starts, stops, bottoms, tops = (np.asarray(a, dtype="<f8") for a in (starts, stops, bottoms, tops))
+    owners = np.asarray(owners, dtype="<i8")
+    if path.lower().endswith(".json"):
+        rois = [[] for _ in starts]
+        for owner, bottom, top in zip(owners.tolist(), bottoms.tolist(), tops.tolist()):
+            rois[owner].append([bottom, top])
+        selections = [{"start": start, "stop": stop, "rois": r}
+                      for start, stop, r in zip(starts.tolist(), stops.tolist(), rois)]
+        with open(path, "w") as f:
+            json.dump({"version": 1, "selections": selections}, f)
+        return
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([len(starts), len(owners)], dtype="<u8").tobytes())
+        for column in (starts, stops, owners, bottoms, tops):
+            f.write(column.tobytes())
+
+
+def read_selections(path):
+    """
+    Loads time selections and their ROIs written by write_selections.
+
+    Args:
+        path (str): File to read.
+
+    Returns:
+        tuple: starts, stops, owners, bottoms and tops arrays.
+    """
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            selections = json.load(f)["selections"]
+        starts = np.array([s["start"] for s in selections], dtype=np.float64)
+        stops = np.array([s["stop"] for s in selections], dtype=np.float64)
+        rois = [(i, r[0], r[1]) for i, s in enumerate(selections) for r in s["rois"]]
+        rois = np.array(rois, dtype=np.float64).reshape(-1, 3)
+        return starts, stops, rois[:, 0].astype(np.int64), rois[:, 1].copy(), rois[:, 2].copy()
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a selection file")
+        n, m = (int(v) for v in np.frombuffer(f.read(16), dtype="<u8"))
+        data = f.read()
+    columns, offset = [], 0
+    for dtype, count in (("<f8", n), ("<f8", n), ("<i8", m), ("<f8", m), ("<f8", m)):
+        columns.append(np.frombuffer(data, dtype, count, offset).astype(dtype[1:]))
+        offset += 8 * count
+    owners = columns[2]
+    if len(owners) and (owners.min() < 0 or owners.max() >= n):
+        raise ValueError(f"{path} has ROIs without a selection")
+    return tuple(columns)
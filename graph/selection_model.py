@@ -0,0 +1,255 @@
+from PyQt6.QtCore import QAbstractTableModel, QSortFilterProxyModel, QModelIndex, Qt
+import numpy as np
+
+from .selection_stats import format_stat
+from .time_format import TimeFormatter, time_formatter
+
+STAT_HEADERS = ["Count","Rate","Mean","Median"]
+ID_ROLE = Qt.ItemDataRole.UserRole
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class SelectionModel(QAbstractTableModel):
+    """
+    Every time selection and ROI as numeric rows of one table model.
+
+    A row is keyed by (time id, roi id), with roi id None for the time
+    selection itself, and holds its bounds (start and stop, or low and high)
+    and its count, rate, mean and median. Values are only formatted when a
+    view asks for the cells it shows, and edits notify views through
+    dataChanged, so views over thousands of rows never rebuild. Views pick
+    their rows through a SelectionFilter proxy.
+    """
+
+    prefetch = 64
+
+    def __init__(self, parent=None, formatter: TimeFormatter = time_formatter):
+        """
+        Initializes the SelectionModel.
+
+        Args:
+            parent: Parent object (optional).
+            formatter (TimeFormatter): Formats start and stop times.
+        """
+        super().__init__(parent)
+        self.formatter = formatter
+        formatter.changed.connect(self.times_changed)
+        self.keys = []
+        self.lows = []
+        self.highs = []
+        self.values = []
+        self.rows = dict()
+        self.empty = (np.nan,) * len(STAT_HEADERS)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2 + len(STAT_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return (["Start","Stop"] + STAT_HEADERS)[section]
+        return super().headerData(section, orientation, role)
+
+    def value(self, row, column):
+        """
+        Reads the number behind a cell.
+
+        Args:
+            row (int): Row index.
+            column (int): Column index.
+
+        Returns:
+            float: The bound or statistic.
+        """
+        if column == 0:
+            return self.lows[row]
+        if column == 1:
+            return self.highs[row]
+        return self.values[row][column - 2]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self.value(row, column)
+            if column > 1:
+                return format_stat(value)
+            if self.keys[row][1] is None:
+                return self.format_time(row, value)
+            return str(round(value, 3))
+        if role == SORT_ROLE:
+            return self.value(row, column)
+        if role == ID_ROLE:
+            trid, roi_id = self.keys[row]
+            return trid if roi_id is None else roi_id
+        return None
+
+    def format_time(self, row, t):
+        """
+        Formats a start or stop time, with the rows after it in the same call.
+
+        Args:
+            row (int): Row of the time.
+            t (float): The time.
+
+        Returns:
+            str: The formatted time.
+        """
+        text = self.formatter.cache.get(t)
+        if text is None:
+            end = row + self.prefetch
+            text = self.formatter.format_many([t] + self.lows[row:end] + self.highs[row:end])[0]
+        return text
+
+    def times_changed(self):
+        """Repaints the start and stop columns after the time format changed."""
+        if self.keys:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.keys) - 1, 1))
+
+    def row(self, trid, roi_id=None):
+        """
+        Finds the row of a selection.
+
+        Args:
+            trid (int): Time selection ID.
+            roi_id (int): ROI ID, None for the time selection.
+
+        Returns:
+            int: The row, None when missing.
+        """
+        return self.rows.get((trid, roi_id))
+
+    def add(self, keys, lows, highs, values=None):
+        """
+        Appends selections in one insert.
+
+        Args:
+            keys (list): (time id, roi id) of every new row.
+            lows (list): Start or low bound of every row.
+            highs (list): Stop or high bound of every row.
+            values (list): Count, rate, mean and median of every row, empty when None.
+        """
+        if not len(keys):
+            return
+        first = len(self.keys)
+        self.beginInsertRows(QModelIndex(), first, first + len(keys) - 1)
+        self.keys.extend(keys)
+        self.lows.extend(lows)
+        self.highs.extend(highs)
+        self.values.extend(values if values is not None else [self.empty] * len(keys))
+        self.rows.update(zip(keys, range(first, len(self.keys))))
+        self.endInsertRows()
+
+    def remove(self, keys):
+        """
+        Removes selections, one removal per run of adjacent rows.
+
+        Args:
+            keys: (time id, roi id) of the rows to remove.
+        """
+        rows = sorted((self.rows[k] for k in keys if k in self.rows), reverse=True)
+        if not rows:
+            return
+        n = 0
+        while n < len(rows):
+            last = first = rows[n]
+            n += 1
+            while n < len(rows) and rows[n] == first - 1:
+                first = rows[n]
+                n += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for column in (self.keys, self.lows, self.highs, self.values):
+                del column[first:last + 1]
+            self.endRemoveRows()
+        self.rows = {k: row for row, k in enumerate(self.keys)}
+
+    def remove_time(self, trid):
+        """
+        Removes a time selection and its ROIs.
+
+        Args:
+            trid (int): Time selection ID.
+        """
+        self.remove_times([trid])
+
+    def remove_times(self, trids):
+        """
+        Removes many time selections and their ROIs at once.
+
+        Args:
+            trids: Time selection IDs.
+        """
+        trids = set(trids)
+        self.remove([k for k in self.keys if k[0] in trids])
+
+    def set_bounds(self, trid, roi_id, low, high):
+        """
+        Moves a selection.
+
+        Args:
+            trid (int): Time selection ID.
+            roi_id (int): ROI ID, None for the time selection.
+            low (float): New start or low bound.
+            high (float): New stop or high bound.
+        """
+        row = self.rows.get((trid, roi_id))
+        if row is None or (self.lows[row], self.highs[row]) == (low, high):
+            return
+        self.lows[row], self.highs[row] = low, high
+        self.dataChanged.emit(self.index(row, 0), self.index(row, 1))
+
+    def set_values(self, trid, roi_id, values):
+        """
+        Sets the statistics of a selection.
+
+        Args:
+            trid (int): Time selection ID.
+            roi_id (int): ROI ID, None for the time selection.
+            values (tuple): Count, rate, mean and median.
+        """
+        row = self.rows.get((trid, roi_id))
+        if row is None:
+            return
+        self.values[row] = tuple(values)
+        self.dataChanged.emit(self.index(row, 2), self.index(row, 1 + len(STAT_HEADERS)))
+
+
+class SelectionFilter(QSortFilterProxyModel):
+    """
+    Shows either the time selections or the ROIs of one time selection.
+
+    Sorting compares the numbers behind the cells, not their text.
+    """
+
+    def __init__(self, model: SelectionModel, rois=False, parent=None):
+        """
+        Initializes the SelectionFilter.
+
+        Args:
+            model (SelectionModel): The shared selections.
+            rois (bool): Show ROIs instead of time selections.
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.rois = rois
+        self.time_id = None
+        self.setSortRole(SORT_ROLE)
+        self.setSourceModel(model)
+
+    def set_time_id(self, time_id):
+        """
+        Sets the time selection whose ROIs are shown.
+
+        Args:
+            time_id (int): Time selection ID, None to show no ROIs.
+        """
+        if time_id != self.time_id:
+            self.time_id = time_id
+            self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        trid, roi_id = self.sourceModel().keys[source_row]
+        if self.rois:
+            return roi_id is not None and trid == self.time_id
+        return roi_id is None
@@ -0,0 +1,220 @@
+import numpy as np
+
+
+class SelectionRecord:
+    """
+    One time selection as plain data.
+
+    The bounds live in the plot's IntervalIndex and the ROI bounds in
+    RoiArrays. The graphics items are only views, present while the
+    selection is in or near the view.
+    """
+
+    __slots__ = ("region", "rois", "next_roi", "stats", "roi_stats")
+
+    def __init__(self, next_roi=0):
+        """
+        Initializes the SelectionRecord.
+
+        Args:
+            next_roi (int): ID the next ROI of the selection gets.
+        """
+        self.region = None
+        self.rois = dict()
+        self.next_roi = next_roi
+        self.stats = None
+        self.roi_stats = dict()
+
+
+class RoiArrays:
+    """
+    The owner, ID and bounds of every ROI in parallel NumPy arrays.
+
+    Rows are appended into arrays grown by doubling. Removed rows are only
+    marked with owner -1 and compacted once they make up half the arrays,
+    so removing many selections stays linear. A dict maps every selection
+    to the rows of its ROIs by ROI ID, so per-selection and per-ROI lookups
+    do not scan the arrays.
+    """
+
+    def __init__(self, capacity=64):
+        """
+        Initializes the RoiArrays.
+
+        Args:
+            capacity (int): Initial number of rows.
+        """
+        self.owners = np.full(capacity, -1, dtype=np.int64)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.bottoms = np.zeros(capacity)
+        self.tops = np.zeros(capacity)
+        self.size = 0
+        self.removed = 0
+        self.index = dict()
+
+    def __len__(self):
+        return self.size - self.removed
+
+    def _reserve(self, count):
+        needed = self.size + count
+        if needed <= len(self.owners):
+            return
+        capacity = max(needed, 2 * len(self.owners))
+        for name, fill in (("owners", -1), ("ids", 0), ("bottoms", 0.0), ("tops", 0.0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _compact(self):
+        keep = np.flatnonzero(self.owners[:self.size] >= 0)
+        n = len(keep)
+        for name in ("owners", "ids", "bottoms", "tops"):
+            column = getattr(self, name)
+            column[:n] = column[keep]
+        self.owners[n:self.size] = -1
+        self.size = n
+        self.removed = 0
+        self.index = dict()
+        for row, (owner, roi_id) in enumerate(zip(self.owners[:n].tolist(), self.ids[:n].tolist())):
+            self.index.setdefault(owner, dict())[roi_id] = row
+
+    def add(self, owners, ids, bottoms, tops):
+        """
+        Appends ROIs, ordering every pair of bounds.
+
+        Args:
+            owners: ID of the time selection of every ROI.
+            ids: ID of every ROI within its selection.
+            bottoms: Lower bound of every ROI.
+            tops: Upper bound of every ROI.
+        """
+        owners = np.asarray(owners, dtype=np.int64).ravel()
+        ids = np.broadcast_to(np.asarray(ids, dtype=np.int64).ravel(), owners.shape)
+        bottoms = np.asarray(bottoms, dtype=np.float64).ravel()
+        tops = np.asarray(tops, dtype=np.float64).ravel()
+        count = len(owners)
+        self._reserve(count)
+        rows = slice(self.size, self.size + count)
+        self.owners[rows] = owners
+        self.ids[rows] = ids
+        self.bottoms[rows] = np.minimum(bottoms, tops)
+        self.tops[rows] = np.maximum(bottoms, tops)
+        for row, (owner, roi_id) in enumerate(zip(owners.tolist(), ids.tolist()), self.size):
+            self.index.setdefault(owner, dict())[roi_id] = row
+        self.size += count
+
+    def rows(self, owner):
+        """
+        Finds the rows of a selection's ROIs.
+
+        Args:
+            owner (int): ID of the time selection.
+
+        Returns:
+            np.ndarray: Row indices, ordered by ROI ID.
+        """
+        rows = self.index.get(owner, dict())
+        return np.array([rows[roi_id] for roi_id in sorted(rows)], dtype=np.int64)
+
+    def _row(self, owner, roi_id):
+        return self.index.get(owner, dict()).get(roi_id)
+
+    def get(self, owner, roi_id):
+        """
+        Gets the bounds of one ROI.
+
+        Args:
+            owner (int): ID of the time selection.
+            roi_id (int): ID of the ROI.
+
+        Returns:
+            tuple: (bottom, top), or None when there is no such ROI.
+        """
+        row = self._row(owner, roi_id)
+        if row is None:
+            return None
+        return float(self.bottoms[row]), float(self.tops[row])
+
+    def set(self, owner, roi_id, bottom, top):
+        """
+        Moves one ROI.
+
+        Args:
+            owner (int): ID of the time selection.
+            roi_id (int): ID of the ROI.
+            bottom (float): Lower bound.
+            top (float): Upper bound.
+        """
+        row = self._row(owner, roi_id)
+        if row is not None:
+            self.bottoms[row], self.tops[row] = min(bottom, top), max(bottom, top)
+
+    def bounds(self, owner):
+        """
+        Gets the bounds of every ROI of a selection.
+
+        Args:
+            owner (int): ID of the time selection.
+
+        Returns:
+            dict: Maps ROI ID to its (bottom, top) bounds, by ID.
+        """
+        rows = self.index.get(owner, dict())
+        return {roi_id: (float(self.bottoms[rows[roi_id]]), float(self.tops[rows[roi_id]])) for roi_id in sorted(rows)}
+
+    def extent(self, owner):
+        """
+        Gets the span covered by the ROIs of a selection.
+
+        Args:
+            owner (int): ID of the time selection.
+
+        Returns:
+            tuple: (lowest bottom, highest top), or None without ROIs.
+        """
+        rows = self.rows(owner)
+        if not len(rows):
+            return None
+        return float(self.bottoms[rows].min()), float(self.tops[rows].max())
+
+    def remove(self, owner, roi_id=None):
+        """
+        Removes one ROI, or every ROI of a selection.
+
+        Args:
+            owner (int): ID of the time selection.
+            roi_id (int): ID of the ROI, all of the selection's ROIs when None.
+
+        Returns:
+            int: Number of removed ROIs.
+        """
+        rows = self.index.get(owner)
+        if rows is None:
+            return 0
+        if roi_id is None:
+            removed = list(rows.values())
+            del self.index[owner]
+        else:
+            row = rows.pop(roi_id, None)
+            removed = [] if row is None else [row]
+            if not rows:
+                del self.index[owner]
+        count = len(removed)
+        if count:
+            self.owners[removed] = -1
+            self.removed += count
+            if self.removed > self.size // 2:
+                self._compact()
+        return count
+
+    def columns(self):
+        """
+        Gets every ROI in row order.
+
+        Returns:
+            tuple: Owners, IDs, bottoms and tops as arrays.
+        """
+        live = self.owners[:self.size] >= 0
+        return (self.owners[:self.size][live], self.ids[:self.size][live],
+                self.bottoms[:self.size][live], self.tops[:self.size][live])
@@ -0,0 +1,207 @@
+import numpy as np
+
+from .trace_store import TraceStore
+
+
+class SelectionStats:
+    """
+    Aggregates of the points inside time selections, per trace and overall.
+
+    Counts come from binary searches on the sorted trace times and sums from
+    block prefix sums, so counts, means and rates of a time selection cost
+    O(log n) per trace and can follow a drag. Medians and percentiles need
+    the selected values themselves and are only computed on request.
+    """
+
+    def __init__(self, store: TraceStore, block: int = 1024, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Initializes the SelectionStats.
+
+        Args:
+            store (TraceStore): Store holding the trace points.
+            block (int): Number of values per prefix sum block.
+            percentiles (tuple): Percentiles computed by full statistics, 50 is the median.
+        """
+        self.store = store
+        self.block = block
+        self.percentiles = tuple(percentiles)
+        self.sums = dict()
+
+    def _block_sums(self, tid):
+        """
+        Returns the running sum of a trace's values at every block boundary.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: Sum of the values before each multiple of block.
+        """
+        version = int(self.store.versions[tid])
+        cached = self.sums.get(tid)
+        if cached is None or cached[0] != version:
+            values = self.store.values(tid)
+            full = len(values) // self.block * self.block
+            sums = np.zeros(full // self.block + 1)
+            np.cumsum(values[:full].reshape(-1, self.block).sum(axis=1), out=sums[1:])
+            cached = self.sums[tid] = (version, sums)
+        return cached[1]
+
+    def value_sum(self, tid, a, b):
+        """
+        Sums the values of a trace between two positions.
+
+        Args:
+            tid (int): Trace id.
+            a (int): First position.
+            b (int): End position, exclusive.
+
+        Returns:
+            float: The sum.
+        """
+        values = self.store.values(tid)
+        first, last = -(-a // self.block), b // self.block
+        if first >= last:
+            return float(values[a:b].sum())
+        sums = self._block_sums(tid)
+        return float(sums[last] - sums[first]
+                     + values[a:first*self.block].sum() + values[last*self.block:b].sum())
+
+    def compute(self, lo, hi, bottom=None, top=None, full=True, tids=None):
+        """
+        Computes the statistics of the points in a selection.
+
+        Args:
+            lo (float): Start of the time selection.
+            hi (float): End of the time selection.
+            bottom (float): Lowest selected value, for ROIs.
+            top (float): Highest selected value, for ROIs.
+            full (bool): Also compute medians and percentiles.
+            tids: Trace ids to include, all traces by default.
+
+        Returns:
+            dict: Per trace arrays "tids", "count", "rate", "mean" and, when
+            full, "percentiles" with one column per percentile, plus "total"
+            holding the same keys for all traces combined.
+        """
+        if lo > hi:
+            lo, hi = hi, lo
+        if tids is None:
+            tids = range(len(self.store))
+        tids = np.asarray(tids, dtype=np.int64)
+        bounded = bottom is not None and top is not None
+        duration = hi - lo
+
+        counts = np.zeros(len(tids), dtype=np.int64)
+        sums = np.zeros(len(tids))
+        selected = []
+        for n, tid in enumerate(tids):
+            s = self.store.time_slice(tid, lo, hi)
+            if bounded or full:
+                values = self.store.values(tid)[s]
+                if bounded:
+                    values = values[(values >= bottom) & (values <= top)]
+                counts[n] = len(values)
+                sums[n] = values.sum()
+                selected.append(values)
+            else:
+                counts[n] = s.stop - s.start
+                sums[n] = self.value_sum(tid, s.start, s.stop)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stats = {"tids": tids,
+                     "count": counts,
+                     "rate": counts / duration if duration > 0 else np.full(len(tids), np.nan),
+                     "mean": sums / counts}
+            total = counts.sum()
+            stats["total"] = {"count": int(total),
+                              "rate": total / duration if duration > 0 else np.nan,
+                              "mean": sums.sum() / total if total else np.nan}
+
+        if full:
+            q = np.array(self.percentiles)
+            stats["percentiles"] = np.array([np.percentile(v, q) if len(v) else np.full(len(q), np.nan)
+                                             for v in selected]).reshape(len(tids), len(q))
+            combined = np.concatenate(selected) if selected else np.empty(0)
+            stats["total"]["percentiles"] = np.percentile(combined, q) if len(combined) else np.full(len(q), np.nan)
+        return stats
+
+    def compute_many(self, los, his):
+        """
+        Computes the quick statistics of many time selections at once.
+
+        Every trace is searched for all selection bounds in one call and
+        summed with one running sum, instead of once per selection.
+
+        Args:
+            los (np.ndarray): Start of every time selection.
+            his (np.ndarray): End of every time selection.
+
+        Returns:
+            list: One dict per selection, shaped like compute with full=False.
+        """
+        los, his = np.minimum(los, his), np.maximum(los, his)
+        tids = np.arange(len(self.store), dtype=np.int64)
+        counts = np.zeros((len(los), len(tids)), dtype=np.int64)
+        sums = np.zeros((len(los), len(tids)))
+        for tid in tids:
+            times = self.store.times(tid)
+            a = np.searchsorted(times, los, "left")
+            b = np.searchsorted(times, his, "right")
+            running = np.concatenate(([0.0], np.cumsum(self.store.values(tid), dtype=np.float64)))
+            counts[:, tid] = b - a
+            sums[:, tid] = running[b] - running[a]
+
+        durations = his - los
+        totals = counts.sum(axis=1)
+        total_sums = sums.sum(axis=1)
+        result = []
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+            for n, duration in enumerate(durations.tolist()):
+                total = int(totals[n])
+                result.append({"tids": tids,
+                               "count": counts[n],
+                               "rate": counts[n] / duration if duration > 0 else np.full(len(tids), np.nan),
+                               "mean": means[n],
+                               "total": {"count": total,
+                                         "rate": total / duration if duration > 0 else np.nan,
+                                         "mean": total_sums[n] / total if total else np.nan}})
+        return result
+
+    def median(self, stats, row=None):
+        """
+        Reads the median out of full statistics.
+
+        Args:
+            stats (dict): Result of compute.
+            row (int): Trace row, None for the total.
+
+        Returns:
+            float: The median, nan when not computed.
+        """
+        if 50 not in self.percentiles:
+            return np.nan
+        column = self.percentiles.index(50)
+        if row is None:
+            percentiles = stats["total"].get("percentiles")
+            return np.nan if percentiles is None else percentiles[column]
+        percentiles = stats.get("percentiles")
+        return np.nan if percentiles is None else percentiles[row, column]
+
+
+def format_stat(value):
+    """
+    Formats one statistic for a table cell.
+
+    Args:
+        value: Number to format, nan for a missing value.
+
+    Returns:
+        str: Up to four significant digits, empty when missing.
+    """
+    if value is None or np.isnan(value):
+        return ""
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.4g}"
@@ -0,0 +1,201 @@
+import threading
+import numpy as np
+
+from .trace_store import TraceStore
+
+
+class TraceGrid:
+    """Grid buckets over a time window of one trace: time columns with values sorted inside each."""
+
+    __slots__ = ("version", "requested", "lo", "hi", "offset", "width", "origin",
+                 "col_start", "ysorted", "order")
+
+    def __init__(self, times, values, width, version, lo=-np.inf, hi=np.inf):
+        """
+        Builds the grid of one trace over the points with lo <= time <= hi.
+
+        Args:
+            times (np.ndarray): Sorted event times of the trace.
+            values (np.ndarray): Values aligned with times.
+            width (float): Bucket width along the time axis.
+            version (int): Store version of the trace at build time.
+            lo (float): Start of the indexed time window.
+            hi (float): End of the indexed time window.
+        """
+        self.version = version
+        self.requested = width
+        self.lo, self.hi = lo, hi
+        self.offset = int(np.searchsorted(times, lo, "left"))
+        stop = int(np.searchsorted(times, hi, "right"))
+        times, values = times[self.offset:stop], values[self.offset:stop]
+
+        n = len(times)
+        self.origin = float(times[0]) if n else 0.0
+        span = float(times[-1]) - self.origin if n else 0.0
+        self.width = max(width, span / max(n, 1), 1e-12)
+
+        ncols = int(span / self.width) + 1
+        edges = self.origin + np.arange(1, ncols) * self.width
+        self.col_start = np.empty(ncols + 1, dtype=np.int64)
+        self.col_start[0] = 0
+        self.col_start[1:-1] = np.searchsorted(times, edges, "left")
+        self.col_start[-1] = n
+
+        cols = np.repeat(np.arange(ncols), np.diff(self.col_start))
+        self.order = np.lexsort((values, cols)).astype(np.int32 if n < 2**31 else np.int64)
+        self.ysorted = values[self.order]
+
+    def candidates(self, x, y, rx, ry):
+        """
+        Finds the point indices inside a box around (x, y).
+
+        Args:
+            x (float): Box centre time.
+            y (float): Box centre value.
+            rx (float): Half width of the box in time.
+            ry (float): Half height of the box in value.
+
+        Returns:
+            np.ndarray: Indices into the trace's arrays.
+        """
+        ncols = len(self.col_start) - 1
+        first = max(int(np.floor((x - rx - self.origin) / self.width)), 0)
+        last = min(int(np.floor((x + rx - self.origin) / self.width)), ncols - 1)
+        if last < first:
+            return np.empty(0, dtype=np.int64)
+
+        ranges = []
+        for col in range(first, last + 1):
+            lo, hi = self.col_start[col], self.col_start[col+1]
+            a, b = np.searchsorted(self.ysorted[lo:hi], (y - ry, y + ry), "left")
+            if b > a:
+                ranges.append(np.arange(lo + a, lo + b))
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return self.order[np.concatenate(ranges)] + self.offset
+
+
+class NearestIndex:
+    """
+    K-nearest-neighbour lookup over the traces of a TraceStore in pixel space.
+
+    Each trace gets its own grid over the visible time window, built lazily
+    on the first query and rebuilt only when that trace's data changes, the
+    query leaves the indexed window or the view zoom drifts far from the
+    scale the grid was built for. Visibility changes only change which grids
+    are queried. The GUI thread takes a snapshot of the trace views and
+    versions, and queries only read that snapshot, so they may run on
+    worker threads while the store keeps changing. Grids are built under a
+    lock.
+    """
+
+    rebuild_ratio = 4.0
+
+    def __init__(self, store: TraceStore):
+        """
+        Initializes the NearestIndex.
+
+        Args:
+            store (TraceStore): Store holding the trace points.
+        """
+        self.store = store
+        self.grids = dict()
+        self.lock = threading.Lock()
+
+    def invalidate(self, tid=None):
+        """
+        Drops the grid of one trace, or of every trace.
+
+        Args:
+            tid (int): Trace id, None for all traces.
+        """
+        if tid is None:
+            self.grids.clear()
+        else:
+            self.grids.pop(tid, None)
+
+    def snapshot(self, tids):
+        """
+        Captures the version and views of traces, on the thread that changes the store.
+
+        Args:
+            tids: Ids of the traces to capture.
+
+        Returns:
+            list: A (tid, version, times, values) tuple for every trace with points.
+        """
+        return [(tid, int(self.store.versions[tid]), self.store.times(tid), self.store.values(tid))
+                for tid in tids if self.store.lengths[tid]]
+
+    def grid(self, tid, version, times, values, width, window=None):
+        """
+        Returns an up to date grid of a trace for the given bucket width.
+
+        Args:
+            tid (int): Trace id.
+            version (int): Store version the views were captured at.
+            times (np.ndarray): Captured event times of the trace.
+            values (np.ndarray): Captured values aligned with times.
+            width (float): Preferred bucket width along the time axis.
+            window (tuple): Time range the grid has to cover, None for the whole trace.
+
+        Returns:
+            TraceGrid: The trace's grid.
+        """
+        lo, hi = window or (-np.inf, np.inf)
+        with self.lock:
+            grid = self.grids.get(tid)
+            if (grid is None or grid.version != version
+                    or lo < grid.lo or grid.hi < hi
+                    or not 1/self.rebuild_ratio <= grid.requested / width <= self.rebuild_ratio):
+                if window is not None:
+                    pad = (hi - lo) / 2
+                    lo, hi = lo - pad, hi + pad
+                grid = TraceGrid(times, values, width, version, lo, hi)
+                self.grids[tid] = grid
+            return grid
+
+    def query(self, x, y, pixel_size, views, k=50, radius=30.0, window=None):
+        """
+        Finds the k points closest to (x, y) in screen pixels.
+
+        Args:
+            x (float): Cursor time.
+            y (float): Cursor value.
+            pixel_size (tuple): Data units per pixel along x and y.
+            views (list): Traces to search, as returned by snapshot.
+            k (int): Maximum number of points returned.
+            radius (float): Search radius in pixels.
+            window (tuple): Visible time range to index, None for whole traces.
+
+        Returns:
+            tuple: Trace ids, times, values and pixel distances of the
+            nearest points, sorted by distance.
+        """
+        sx, sy = pixel_size
+        rx, ry = radius * sx, radius * sy
+        found_ids, found_x, found_y, found_d = [], [], [], []
+        for tid, version, times, values in views:
+            if window is not None:
+                window = (min(window[0], x - rx), max(window[1], x + rx))
+            idx = self.grid(tid, version, times, values, 2 * rx, window).candidates(x, y, rx, ry)
+            if not len(idx):
+                continue
+            xs = times[idx]
+            ys = values[idx]
+            dist = np.hypot((xs - x) / sx, (ys - y) / sy)
+            keep = dist <= radius
+            found_ids.append(np.full(int(keep.sum()), tid, dtype=np.int32))
+            found_x.append(xs[keep])
+            found_y.append(ys[keep])
+            found_d.append(dist[keep])
+
+        if not found_d:
+            empty = np.empty(0)
+            return np.empty(0, dtype=np.int32), empty, empty, empty
+        ids, xs, ys, dist = (np.concatenate(a) for a in (found_ids, found_x, found_y, found_d))
+        if len(dist) > k:
+            part = np.argpartition(dist, k - 1)[:k]
+            ids, xs, ys, dist = ids[part], xs[part], ys[part], dist[part]
+        order = np.argsort(dist, kind="stable")
+        return ids[order], xs[order], ys[order], dist[order]
@@ -1,6 +1,8 @@
 from pyqtgraph import LinearRegionItem, ROI
 from PyQt6.QtCore import QPointF, pyqtSignal, Qt
 
+from .profiler import profiled
+
 class TimeRegion(LinearRegionItem):
     """A linear region item with a unique ID and click signal."""
 
@@ -16,7 +18,20 @@ class TimeRegion(LinearRegionItem):
         """
         super().__init__(values)
         self.trid = trid
-        
+
+    def reuse(self, values, trid):
+        """
+        Moves a pooled region to another selection without emitting change signals.
+
+        Args:
+            values: New region boundaries.
+            trid (int): Unique ID for the region.
+        """
+        self.trid = trid
+        self.blockSignals(True)
+        self.setRegion(values)
+        self.blockSignals(False)
+
     def mouseDoubleClickEvent(self, event):
         """
         Handles double-click events and emits the clicked signal.
@@ -60,6 +75,36 @@ class BoundROI(ROI):
         self.region.sigRegionChanged.connect(self.reshape)
         self.addScaleHandle((.5,0),(.5,.5))
         self.addScaleHandle((.5,1),(.5,.5))
+
+    def reuse(self, top, bottom, region: TimeRegion, roi_id):
+        """
+        Binds a pooled ROI to another region without emitting change signals.
+
+        Args:
+            top (float): Top boundary of the ROI.
+            bottom (float): Bottom boundary of the ROI.
+            region (TimeRegion): Associated TimeRegion.
+            roi_id (int): Unique ID for the ROI.
+        """
+        self.detach()
+        self.roi_id = roi_id
+        self.region = region
+        if bottom>top:
+            top, bottom = bottom, top
+        self.top = top
+        self.bottom = bottom
+        self.left, self.right = region.getRegion()
+        self.blockSignals(True)
+        ROI.setPos(self, [self.left,self.bottom], update=False, finish=False)
+        ROI.setSize(self, [self.right-self.left, self.top-self.bottom], finish=False)
+        self.blockSignals(False)
+        region.sigRegionChanged.connect(self.reshape)
+
+    def detach(self):
+        """Stops following the associated TimeRegion."""
+        if self.region is not None:
+            self.region.sigRegionChanged.disconnect(self.reshape)
+            self.region = None
     
     def mouseClickEvent(self, event):
         """
@@ -72,19 +117,22 @@ class BoundROI(ROI):
         #print("roi double click")
         self.clicked.emit(self.roi_id)
 
+    @profiled("BoundROI.reshape")
     def reshape(self):
         """
         Reshapes the ROI based on the associated TimeRegion.
+
+        Moves and resizes in one step without finishing the change, so a
+        region drag emits roi_changed once per move and no finished signal.
         """
         self.left, self.right = self.region.getRegion()
 
         pos = [self.left,self.bottom]
         size = [self.right-self.left, self.top-self.bottom]
         
-        self.edditable = True
-        self.setPos(pos)
-        self.setSize(size)
-        self.edditable = False
+        ROI.setPos(self, pos, update=False, finish=False)
+        ROI.setSize(self, size, finish=False)
+        self.roi_changed.emit()
     
     def setPos(self, pos, y=None, update=True, finish=True):
         """
@@ -98,7 +146,7 @@ class BoundROI(ROI):
         """
         if not self.edditable:
             pos = QPointF(self.pos()[0], pos.y())
-            super().setPos(pos)
+            super().setPos(pos, update=update, finish=finish)
             
         else:
             super().setPos(pos, y, update, finish)
@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QAbstractItemView
+from PyQt6.QtGui import QIcon
+import numpy as np
+
+from .selection_stats import format_stat
+from .trace_registry import registry
+from .profiler import profiled
+
+
+class StatsTable(QTableWidget):
+    """A table showing the per-trace statistics of one selection."""
+
+    def __init__(self, parent=None):
+        """
+        Initializes the StatsTable.
+
+        Args:
+            parent: Parent widget (optional).
+        """
+        super().__init__(0, 4, parent)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.verticalHeader().setVisible(False)
+        self.set_percentiles(())
+
+    def set_percentiles(self, percentiles):
+        """
+        Sets the percentile columns.
+
+        Args:
+            percentiles (tuple): Percentiles shown after the mean, 50 is shown as the median.
+        """
+        if getattr(self, "percentiles", None) == tuple(percentiles):
+            return
+        self.percentiles = tuple(percentiles)
+        headers = ["Trace","Count","Rate","Mean"]
+        headers += ["Median" if q == 50 else f"P{q:g}" for q in self.percentiles]
+        self.setColumnCount(len(headers))
+        self.setHorizontalHeaderLabels(headers)
+
+    def _set_row(self, row, name, color, cells):
+        for col, text in enumerate([name] + cells):
+            item = self.item(row, col)
+            if item is None:
+                item = QTableWidgetItem()
+                self.setItem(row, col, item)
+            item.setText(text)
+        self.item(row, 0).setIcon(registry.icon(color) if color is not None else QIcon())
+
+    @profiled("StatsTable.set_stats")
+    def set_stats(self, stats, names, colors):
+        """
+        Shows a selection's statistics, the total first, then every trace with points in it.
+
+        Cells are reused and columns sized once, so refreshing during a drag
+        stays cheap.
+
+        Args:
+            stats (dict): Result of SelectionStats.compute.
+            names (list): Trace names, indexed by trace id.
+            colors (list): Trace colors, indexed by trace id.
+        """
+        total = stats["total"]
+        rows = np.flatnonzero(stats["count"])
+        no_percentiles = np.full(len(self.percentiles), np.nan)
+        self.setUpdatesEnabled(False)
+        self.setRowCount(len(rows) + 1)
+        self._set_row(0, "All", None,
+                      [format_stat(v) for v in (total["count"], total["rate"], total["mean"],
+                                                *total.get("percentiles", no_percentiles))])
+        percentiles = stats.get("percentiles")
+        for row, n in enumerate(rows, 1):
+            tid = stats["tids"][n]
+            values = percentiles[n] if percentiles is not None else no_percentiles
+            self._set_row(row, names[tid], colors[tid],
+                          [format_stat(v) for v in (stats["count"][n], stats["rate"][n],
+                                                    stats["mean"][n], *values)])
+        self.resizeColumnsToContents()
+        self.setUpdatesEnabled(True)
+
+    def clear_stats(self):
+        """Removes every row."""
+        self.setRowCount(0)
@@ -0,0 +1,308 @@
+import queue
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .ring_store import RingTraceStore
+
+
+class StreamSource(ABC):
+    """
+    A producer of live events running on its own thread.
+
+    Subclasses implement run. Events are pushed as (name, times) chunks into a bounded queue. When the
+    queue is full the producer waits, never the GUI, which only drains
+    whatever is queued.
+    """
+
+    def __init__(self, max_chunks: int = 4096):
+        """
+        Initializes the StreamSource.
+
+        Args:
+            max_chunks (int): Number of chunks queued before the producer waits.
+        """
+        self.queue = queue.Queue(max_chunks)
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Starts producing on a daemon thread."""
+        self.running.set()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops producing and waits briefly for the thread to finish."""
+        self.running.clear()
+        if self.thread is not None:
+            self.thread.join(1.0)
+            self.thread = None
+
+    @abstractmethod
+    def run(self):
+        """Produces chunks until stopped."""
+
+    def push(self, name, times):
+        """
+        Queues a chunk, waiting while the queue is full.
+
+        Args:
+            name (str): Trace name.
+            times (np.ndarray): Event times as epoch seconds.
+        """
+        while self.running.is_set():
+            try:
+                self.queue.put((name, times), timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def push_lines(self, lines):
+        """
+        Parses "<name> <epoch seconds>" lines and queues one chunk per trace.
+
+        Malformed lines are skipped.
+
+        Args:
+            lines (list): Lines as str or bytes.
+        """
+        chunks = defaultdict(list)
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode(errors="replace")
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            try:
+                t = float(parts[1])
+            except ValueError:
+                continue
+            chunks[parts[0]].append(t)
+        for name, times in chunks.items():
+            self.push(name, np.array(times))
+
+    def drain(self, max_chunks: int):
+        """
+        Takes queued chunks without waiting.
+
+        Args:
+            max_chunks (int): Maximum number of chunks to take.
+
+        Returns:
+            list: (name, times) chunks.
+        """
+        chunks = []
+        for _ in range(max_chunks):
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return chunks
+
+
+class SimulatedSource(StreamSource):
+    """Produces Poisson events for a number of traces in real time."""
+
+    def __init__(self, traces: int = 48, rate: float = 2.0, interval: float = 0.05, seed=None, **kargs):
+        """
+        Initializes the SimulatedSource.
+
+        Args:
+            traces (int): Number of traces.
+            rate (float): Mean number of events per second in each trace.
+            interval (float): Seconds between pushed chunks.
+            seed: Seed for the random generator.
+            **kargs: Keyword arguments for StreamSource.
+        """
+        super().__init__(**kargs)
+        self.traces = traces
+        self.rate = rate
+        self.interval = interval
+        self.rng = np.random.default_rng(seed)
+
+    def run(self):
+        last = time.time()
+        while self.running.is_set():
+            time.sleep(self.interval)
+            now = time.time()
+            counts = self.rng.poisson(self.rate * (now - last), self.traces)
+            for i in np.flatnonzero(counts):
+                self.push(str(i).zfill(4), np.sort(self.rng.uniform(last, now, counts[i])))
+            last = now
+
+
+class LineSource(StreamSource):
+    """Reads "<name> <epoch seconds>" lines from a file object, such as a pipe."""
+
+    def __init__(self, stream, batch_size: int = 1024, interval: float = 0.05, **kargs):
+        """
+        Initializes the LineSource.
+
+        Args:
+            stream: Text or binary file object to read.
+            batch_size (int): Number of lines gathered before a push.
+            interval (float): Seconds after which gathered lines are pushed anyway.
+            **kargs: Keyword arguments for StreamSource.
+        """
+        super().__init__(**kargs)
+        self.stream = stream
+        self.batch_size = batch_size
+        self.interval = interval
+
+    def run(self):
+        lines = []
+        flushed = time.time()
+        for line in self.stream:
+            if not self.running.is_set():
+                return
+            lines.append(line)
+            if len(lines) >= self.batch_size or time.time() - flushed >= self.interval:
+                self.push_lines(lines)
+                lines = []
+                flushed = time.time()
+        self.push_lines(lines)
+
+
+class SocketSource(StreamSource):
+    """Listens on a TCP port for "<name> <epoch seconds>" lines from any number of clients."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, **kargs):
+        """
+        Initializes the SocketSource.
+
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on, 0 picks a free port.
+            **kargs: Keyword arguments for StreamSource.
+        """
+        super().__init__(**kargs)
+        self.server = socket.create_server((host, port))
+        self.server.settimeout(0.1)
+        self.port = self.server.getsockname()[1]
+
+    def stop(self):
+        super().stop()
+        self.server.close()
+
+    def run(self):
+        while self.running.is_set():
+            try:
+                connection, _ = self.server.accept()
+            except (socket.timeout, OSError):
+                continue
+            threading.Thread(target=self.receive, args=(connection,), daemon=True).start()
+
+    def receive(self, connection):
+        """
+        Reads lines from one client until it disconnects or the source stops.
+
+        Args:
+            connection (socket.socket): Accepted client connection.
+        """
+        pending = b""
+        connection.settimeout(0.1)
+        with connection:
+            while self.running.is_set():
+                try:
+                    data = connection.recv(1 << 16)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b"\n")
+                self.push_lines(lines)
+        self.push_lines([pending])
+
+
+class LiveStream(QObject):
+    """
+    Moves queued events from a StreamSource into a RingTraceStore on a timer.
+
+    The timer runs at most fps times a second and each tick only drains the
+    queue, so ingest never waits on the producer and redraws are capped at
+    the timer rate. Values are the gap to the previous event of the trace,
+    so a trace's first event is only remembered, and events older than
+    everything its ring still holds are dropped. Late events are merged
+    into the ring and the gaps from them on are recomputed.
+    """
+
+    trace_added = pyqtSignal(int)
+    updated = pyqtSignal()
+
+    def __init__(self, source: StreamSource, store: RingTraceStore, fps: float = 30.0, max_chunks: int = 4096):
+        """
+        Initializes the LiveStream.
+
+        Args:
+            source (StreamSource): Producer of the events.
+            store (RingTraceStore): Store receiving the events.
+            fps (float): Maximum number of ingests and redraws per second.
+            max_chunks (int): Maximum number of chunks taken per tick.
+        """
+        super().__init__()
+        self.source = source
+        self.store = store
+        self.max_chunks = max_chunks
+        self.first = dict()
+        self.timer = QTimer(self)
+        self.timer.setInterval(max(1, int(1000 / fps)))
+        self.timer.timeout.connect(self.ingest)
+
+    def start(self):
+        """Starts the producer and the ingest timer."""
+        self.source.start()
+        self.timer.start()
+
+    def stop(self):
+        """Stops the ingest timer and the producer."""
+        self.timer.stop()
+        self.source.stop()
+
+    def ingest(self):
+        """Appends every queued chunk to the store and signals a redraw."""
+        chunks = self.source.drain(self.max_chunks)
+        if not chunks:
+            return
+        grouped = defaultdict(list)
+        for name, times in chunks:
+            grouped[name].append(times)
+
+        for name, parts in grouped.items():
+            times = np.sort(np.concatenate(parts))
+            if not len(times):
+                continue
+            tid = self.store.ids.get(name)
+            if tid is None:
+                tid = self.store.add_trace(name)
+                self.trace_added.emit(tid)
+            stored = self.store.times(tid)
+            if len(stored):
+                times = times[times >= stored[0]]
+                if not len(times):
+                    continue
+                late = times[0] < stored[-1]
+                before = np.searchsorted(stored, times[0], "right") - 1
+                values = np.diff(times, prepend=stored[before])
+                if late:
+                    self.store.append(tid, times, values)
+                    stored = self.store.times(tid)
+                    start = max(int(np.searchsorted(stored, times[0], "left")), 1)
+                    self.store.update_values(tid, start, np.diff(stored[start-1:]))
+                    continue
+            else:
+                if tid in self.first:
+                    times = np.sort(np.append(times, self.first.pop(tid)))
+                if len(times) == 1:
+                    self.first[tid] = times[0]
+                    continue
+                values = np.diff(times)
+                times = times[1:]
+            self.store.append(tid, times, values)
+        self.updated.emit()
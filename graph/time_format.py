@@ -0,0 +1,121 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from datetime import datetime, timezone
+import numpy as np
+
+PRECISIONS = {"s": 0, "ms": 3, "us": 6}
+
+
+class TimeFormatter(QObject):
+    """
+    Formats epoch seconds as ISO times, in bulk and with a cache.
+
+    Arrays are converted with NumPy datetime64 in one call instead of one
+    datetime per value, and recent results are kept so tables repainting
+    the same rows do not format them again. Precision and timezone are
+    shared by every table using the formatter; changing them empties the
+    cache and emits changed so views can repaint.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, precision="ms", tz=timezone.utc, cache_size=65536, parent=None):
+        """
+        Initializes the TimeFormatter.
+
+        Args:
+            precision (str): Smallest unit shown, "s", "ms" or "us".
+            tz: tzinfo to show times in, None for the local timezone.
+            cache_size (int): Number of formatted times kept.
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.precision = precision
+        self.tz = tz
+        self.cache_size = cache_size
+        self.cache = dict()
+
+    def set_precision(self, precision):
+        """
+        Sets the smallest unit shown.
+
+        Args:
+            precision (str): "s", "ms" or "us".
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"unknown precision {precision!r}")
+        if precision != self.precision:
+            self.precision = precision
+            self.cache.clear()
+            self.changed.emit()
+
+    def set_timezone(self, tz):
+        """
+        Sets the timezone times are shown in.
+
+        Args:
+            tz: tzinfo, None for the local timezone.
+        """
+        if tz != self.tz:
+            self.tz = tz
+            self.cache.clear()
+            self.changed.emit()
+
+    def _offsets(self, times):
+        """
+        Finds the UTC offset of every time, once per distinct hour.
+
+        Args:
+            times (np.ndarray): Epoch seconds.
+
+        Returns:
+            np.ndarray: Offsets in seconds.
+        """
+        if self.tz is timezone.utc or not len(times):
+            return np.zeros(len(times))
+        hours, inverse = np.unique(np.floor(times / 3600), return_inverse=True)
+        offsets = np.array([datetime.fromtimestamp(h * 3600, timezone.utc).astimezone(self.tz).utcoffset().total_seconds()
+                            for h in hours.tolist()])
+        return offsets[inverse]
+
+    def format_many(self, times):
+        """
+        Formats many times in one call and caches them.
+
+        Args:
+            times: Epoch seconds.
+
+        Returns:
+            list: One string per time, empty for nan.
+        """
+        times = np.asarray(times, dtype=np.float64).ravel()
+        valid = np.isfinite(times)
+        unit = self.precision
+        ticks = np.zeros(len(times), dtype=np.int64)
+        local = times[valid] + self._offsets(times[valid])
+        ticks[valid] = np.round(local * 10 ** PRECISIONS[unit]).astype(np.int64)
+        text = np.datetime_as_string(ticks.astype(f"datetime64[{unit}]"), unit=unit)
+        text[~valid] = ""
+        text = text.tolist()
+
+        if len(self.cache) + len(text) > self.cache_size:
+            self.cache.clear()
+        self.cache.update(zip(times.tolist(), text))
+        return text
+
+    def format(self, t):
+        """
+        Formats one time, from the cache when it was formatted recently.
+
+        Args:
+            t (float): Epoch seconds.
+
+        Returns:
+            str: The formatted time.
+        """
+        text = self.cache.get(t)
+        if text is None:
+            text = self.format_many([t])[0]
+        return text
+
+
+time_formatter = TimeFormatter()
@@ -0,0 +1,201 @@
+import json
+import os
+import tempfile
+import numpy as np
+
+from .trace_store import TraceStore
+
+MAGIC = b"QTRACE01"
+ALIGN = 64
+
+
+class TraceFileWriter:
+    """
+    Writes the on-disk trace format.
+
+    Layout: the 8 byte magic, a little-endian uint64 header length, a UTF-8
+    JSON header space-padded to a 64 byte boundary, then three packed columns
+    holding every trace back to back: float64 times, float64 values and
+    int32 trace ids. The header lists each trace's name, color, start,
+    count and value range.
+
+    Traces can be written in chunks, so files larger than memory can be
+    produced as long as each trace's point count is known up front. The
+    columns go to a temporary file next to the target, which only replaces
+    it on close, so a store still mapped from the target stays readable
+    while it is being saved over.
+    """
+
+    def __init__(self, path, names, colors, counts):
+        """
+        Creates the file and reserves its columns.
+
+        Args:
+            path (str): File to write.
+            names (list): Trace names.
+            colors (list): Trace colors.
+            counts (list): Number of points each trace will hold.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        starts = np.zeros(len(counts), dtype=np.int64)
+        if len(counts):
+            starts[1:] = np.cumsum(counts)[:-1]
+        self.path = path
+        fd, self.temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        self.names, self.colors = list(names), list(colors)
+        self.starts, self.counts = starts, counts
+        self.written = np.zeros(len(counts), dtype=np.int64)
+        self.ranges = [[None, None] for _ in counts]
+        self.total = int(counts.sum())
+
+        self.data_offset = self._header_size()
+        size = self.data_offset + self.total * 20
+        with open(self.temp_path, "wb") as f:
+            f.truncate(size)
+        self.time, self.value, self.trace_id = _columns(self.temp_path, "r+", self.data_offset, self.total)
+
+    def _header(self):
+        """
+        Builds the JSON header.
+
+        Returns:
+            bytes: Encoded header without padding.
+        """
+        traces = [{"name": name, "color": color, "start": int(start), "count": int(count),
+                   "min": lo, "max": hi}
+                  for name, color, start, count, (lo, hi)
+                  in zip(self.names, self.colors, self.starts, self.counts, self.ranges)]
+        return json.dumps({"version": 1, "count": self.total, "traces": traces}).encode()
+
+    def _header_size(self):
+        """
+        Computes where the columns start, leaving room for the final value ranges.
+
+        Returns:
+            int: Byte offset of the time column.
+        """
+        self.ranges = [[-1.7976931348623157e308, 1.7976931348623157e308] for _ in self.counts]
+        size = 16 + len(self._header())
+        self.ranges = [[None, None] for _ in self.counts]
+        return -(-size // ALIGN) * ALIGN
+
+    def write(self, tid, time, value):
+        """
+        Appends a chunk to a trace.
+
+        Args:
+            tid (int): Trace index.
+            time (np.ndarray): Increasing event times.
+            value (np.ndarray): Values aligned with time.
+        """
+        n = len(time)
+        if self.written[tid] + n > self.counts[tid]:
+            raise ValueError(f"trace {self.names[tid]!r} holds only {self.counts[tid]} points")
+        start = int(self.starts[tid] + self.written[tid])
+        self.time[start:start+n] = time
+        self.value[start:start+n] = value
+        self.trace_id[start:start+n] = tid
+        self.written[tid] += n
+        if n:
+            lo, hi = self.ranges[tid]
+            self.ranges[tid] = [float(np.min(value)) if lo is None else min(lo, float(np.min(value))),
+                                float(np.max(value)) if hi is None else max(hi, float(np.max(value)))]
+
+    def close(self):
+        """Writes the header, flushes the columns and moves the file over the target."""
+        if (self.written != self.counts).any():
+            raise ValueError("not every trace was fully written")
+        for column in (self.time, self.value, self.trace_id):
+            if isinstance(column, np.memmap):
+                column.flush()
+        self.time = self.value = self.trace_id = None
+        header = self._header().ljust(self.data_offset - 16)
+        with open(self.temp_path, "r+b") as f:
+            f.write(MAGIC)
+            f.write(np.array(len(header), dtype="<u8").tobytes())
+            f.write(header)
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        """Drops the partly written file, leaving the target untouched."""
+        self.time = self.value = self.trace_id = None
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.close()
+            except BaseException:
+                self.discard()
+                raise
+        else:
+            self.discard()
+
+
+def _columns(path, mode, offset, count):
+    """
+    Maps the three columns of a trace file.
+
+    Args:
+        path (str): Trace file.
+        mode (str): np.memmap mode.
+        offset (int): Byte offset of the time column.
+        count (int): Total number of points.
+
+    Returns:
+        tuple: Time, value and trace id arrays.
+    """
+    if not count:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int32)
+    time = np.memmap(path, np.float64, mode, offset, (count,))
+    value = np.memmap(path, np.float64, mode, offset + 8 * count, (count,))
+    trace_id = np.memmap(path, np.int32, mode, offset + 16 * count, (count,))
+    return time, value, trace_id
+
+
+def write_trace_file(path, store: TraceStore, colors):
+    """
+    Saves every trace of a store.
+
+    Args:
+        path (str): File to write.
+        store (TraceStore): Store to save.
+        colors (list): Color of each trace, indexed by trace id.
+    """
+    with TraceFileWriter(path, store.names, colors, store.lengths) as writer:
+        for tid in range(len(store)):
+            writer.write(tid, store.times(tid), store.values(tid))
+
+
+def open_trace_file(path):
+    """
+    Opens a trace file as a memory-mapped TraceStore.
+
+    Only the header is read, column pages are loaded on first access.
+
+    Args:
+        path (str): Trace file.
+
+    Returns:
+        tuple: The store and the color of each trace.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        length = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        header = json.loads(f.read(length))
+
+    offset = 16 + length
+    traces = header["traces"]
+    time, value, trace_id = _columns(path, "r", offset, header["count"])
+    store = TraceStore.from_columns(time, value, trace_id,
+                                    [t["start"] for t in traces],
+                                    [t["count"] for t in traces],
+                                    [t["name"] for t in traces],
+                                    [(t["min"], t["max"]) for t in traces])
+    return store, [t["color"] for t in traces]
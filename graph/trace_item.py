@@ -0,0 +1,123 @@
+from pyqtgraph import PlotDataItem, ScatterPlotItem
+import numpy as np
+
+from .trace_store import TraceStore
+
+
+class TraceItem(PlotDataItem):
+    """A plot item drawing a reduced view of a stored trace, bounded by the full trace."""
+
+    def __init__(self, store: TraceStore, tid: int, *args, **kargs):
+        """
+        Initializes the TraceItem.
+
+        Args:
+            store (TraceStore): Store holding the trace points.
+            tid (int): Trace id.
+            *args: Positional arguments for PlotDataItem.
+            **kargs: Keyword arguments for PlotDataItem.
+        """
+        self.store = store
+        self.tid = tid
+        self.loaded = None
+        super().__init__(*args, **kargs)
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        """
+        Returns the range of the whole trace along one axis.
+
+        Auto ranging uses this, so it fits the stored data rather than the
+        subset currently drawn.
+
+        Args:
+            ax (int): 0 for time, 1 for value.
+            frac (float): Ignored, the full range is always returned.
+            orthoRange: Optional time range restricting the value bounds.
+
+        Returns:
+            tuple: Minimum and maximum, or (None, None) for an empty trace.
+        """
+        times = self.store.times(self.tid)
+        values = self.store.values(self.tid)
+        if not len(times):
+            return (None, None)
+        if ax == 0:
+            return (float(times[0]), float(times[-1]))
+        if orthoRange is not None:
+            values = values[self.store.time_slice(self.tid, *orthoRange)]
+            if not len(values):
+                return (None, None)
+            return (float(values.min()), float(values.max()))
+        return self.store.value_range(self.tid)
+
+
+class MergedScatterItem(ScatterPlotItem):
+    """
+    A scatter item drawing many traces at once, styled per trace instead of per point.
+
+    Points are stored as consecutive groups, one per trace. Restyling looks up
+    one atlas symbol per group and broadcasts it to the points with NumPy, so
+    a mode switch or a visibility change is a few array writes and a single
+    repaint instead of a style lookup for every point.
+    """
+
+    def __init__(self, *args, **kargs):
+        """
+        Initializes the MergedScatterItem.
+
+        Args:
+            *args: Positional arguments for ScatterPlotItem.
+            **kargs: Keyword arguments for ScatterPlotItem.
+        """
+        self.group_index = None
+        self.group_brushes = None
+        super().__init__(*args, **kargs)
+
+    def set_groups(self, x, y, lengths, brushes):
+        """
+        Replaces the points with consecutive per-trace groups.
+
+        Args:
+            x (np.ndarray): X-coordinates of all groups, concatenated.
+            y (np.ndarray): Y-coordinates of all groups, concatenated.
+            lengths (list): Number of points in each group.
+            brushes (list): Brush of each group.
+        """
+        self.group_index = np.repeat(np.arange(len(lengths)), lengths)
+        self.group_brushes = brushes
+        self.setData(x=x, y=y)
+
+    def set_group_brushes(self, brushes):
+        """
+        Restyles every group with one brush each.
+
+        Args:
+            brushes (list): Brush of each group.
+        """
+        self.group_brushes = brushes
+        self.data['sourceRect'] = 0
+        self.updateSpots()
+
+    def updateSpots(self, dataSet=None):
+        """
+        Assigns atlas symbols per group, falling back to per-point styling.
+
+        Args:
+            dataSet: Points to update, all points by default.
+        """
+        if dataSet is None:
+            dataSet = self.data
+        if (self.group_index is None or len(self.group_index) != len(dataSet)
+                or len(dataSet) != len(self.data)
+                or not (self.opts['pxMode'] and self.opts['useCache'])):
+            return super().updateSpots(dataSet)
+
+        brushes = np.empty(len(self.group_brushes), dtype=object)
+        brushes[:] = self.group_brushes
+        styles = [(self.opts['symbol'], self.opts['size'], self.opts['pen'], brush) for brush in brushes]
+        rects = np.array(self.fragmentAtlas[styles], dtype=dataSet['sourceRect'].dtype)
+        dataSet['brush'] = brushes[self.group_index]
+        dataSet['sourceRect'] = rects[self.group_index]
+        self._maybeRebuildAtlas()
+        self._updateMaxSpotSizes(data=dataSet)
+        self.invalidate()
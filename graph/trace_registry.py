@@ -0,0 +1,91 @@
+from pyqtgraph import colormap, mkBrush
+from PyQt6.QtGui import QColor, QPixmap, QIcon
+
+from .color import colors
+
+GOLDEN = 0.6180339887498949
+
+
+class TraceRegistry:
+    """
+    Colors for any number of traces, with cached brushes and icons.
+
+    The first traces keep the named palette. Later ones are sampled from a
+    perceptually uniform cyclic colormap, stepping by the golden ratio so
+    neighbouring traces land far apart, with alternating lightness once the
+    hues get close. Colors are hex strings, so they save to trace files and
+    compare like the named ones.
+    """
+
+    def __init__(self, cmap="CET-C6", palette=colors):
+        """
+        Initializes the TraceRegistry.
+
+        Args:
+            cmap (str): Cyclic colormap for traces beyond the palette.
+            palette (list): Named colors used first.
+        """
+        self.cmap = colormap.get(cmap)
+        self.palette = list(palette)
+        self.generated = dict()
+        self.brushes = dict()
+        self.icons = dict()
+
+    def color(self, i):
+        """
+        Gets the color of a trace index.
+
+        Args:
+            i (int): Trace index.
+
+        Returns:
+            str: The color.
+        """
+        if i < len(self.palette):
+            return self.palette[i]
+        color = self.generated.get(i)
+        if color is None:
+            n = i - len(self.palette)
+            color = self.cmap.map((n * GOLDEN) % 1.0, mode="qcolor")
+            shade = n // 12 % 3
+            if shade == 1:
+                color = color.darker(140)
+            elif shade == 2:
+                color = color.lighter(130)
+            color = self.generated[i] = color.name()
+        return color
+
+    def brush(self, color):
+        """
+        Returns the shared brush of a color.
+
+        Args:
+            color (str): Brush color.
+
+        Returns:
+            QBrush: The cached brush.
+        """
+        brush = self.brushes.get(color)
+        if brush is None:
+            brush = self.brushes[color] = mkBrush(color)
+        return brush
+
+    def icon(self, color):
+        """
+        Returns the shared 20x20 square icon of a color.
+
+        Args:
+            color (str): Icon color.
+
+        Returns:
+            QIcon: The cached icon.
+        """
+        icon = self.icons.get(color)
+        if icon is None:
+            pixmap = QPixmap(20, 20)
+            pixmap.fill(QColor(color))
+            icon = self.icons[color] = QIcon(pixmap)
+        return icon
+
+
+registry = TraceRegistry()
@@ -0,0 +1,366 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class TraceReader(ABC):
+    """
+    Read access shared by the trace stores.
+
+    Subclasses keep names, versions, lengths and the ranges cache and
+    implement times and values, returning sorted per-trace views. Everything else
+    here is derived from those views.
+    """
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def size(self):
+        """int: Total number of stored points."""
+        return int(self.lengths.sum())
+
+    @abstractmethod
+    def times(self, tid: int):
+        """
+        Returns a view of a trace's event times.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: Sorted event times.
+        """
+
+    @abstractmethod
+    def values(self, tid: int):
+        """
+        Returns a view of a trace's values.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: Values aligned with times.
+        """
+
+    def last_time(self, tid: int):
+        """
+        Returns the newest time of a trace.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            float: The time, or None for an empty trace.
+        """
+        times = self.times(tid)
+        return float(times[-1]) if len(times) else None
+
+    def value_range(self, tid: int):
+        """
+        Returns the smallest and largest value of a trace, cached per version.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            tuple: Minimum and maximum, or (None, None) for an empty trace.
+        """
+        version = int(self.versions[tid])
+        cached = self.ranges.get(tid)
+        if cached is None or cached[0] != version:
+            values = self.values(tid)
+            if len(values):
+                cached = (version, float(values.min()), float(values.max()))
+            else:
+                cached = (version, None, None)
+            self.ranges[tid] = cached
+        return cached[1:]
+
+    def time_slice(self, tid: int, lo: float, hi: float):
+        """
+        Finds the points of a trace with lo <= time <= hi by binary search.
+
+        Args:
+            tid (int): Trace id.
+            lo (float): Start of the time range.
+            hi (float): End of the time range.
+
+        Returns:
+            slice: Slice into the trace's views.
+        """
+        times = self.times(tid)
+        return slice(int(np.searchsorted(times, lo, "left")),
+                     int(np.searchsorted(times, hi, "right")))
+
+    def slice_by_time(self, lo: float, hi: float, tids=None):
+        """
+        Returns views of every trace restricted to a time range.
+
+        Args:
+            lo (float): Start of the time range.
+            hi (float): End of the time range.
+            tids: Trace ids to include, all traces by default.
+
+        Returns:
+            dict: Maps trace id to a (times, values) pair of views.
+        """
+        if tids is None:
+            tids = range(len(self.names))
+        views = dict()
+        for tid in tids:
+            s = self.time_slice(tid, lo, hi)
+            views[tid] = (self.times(tid)[s], self.values(tid)[s])
+        return views
+
+
+class TraceStore(TraceReader):
+    """
+    Columnar storage for the event times and values of every trace.
+
+    All traces share three contiguous columns: float64 times, float64 values
+    and an int32 trace id. Each trace owns one segment of the columns, found
+    through the offset tables, so per-trace views are plain slices. Segments
+    keep spare capacity and grow by doubling, unused slots carry trace id -1.
+    Times inside each segment are kept sorted, which makes the segment its
+    own time index for binary-search range lookups.
+    """
+
+    def __init__(self, capacity: int = 0):
+        """
+        Initializes the TraceStore.
+
+        Args:
+            capacity (int): Number of points to preallocate.
+        """
+        self.time = np.empty(capacity, dtype=np.float64)
+        self.value = np.empty(capacity, dtype=np.float64)
+        self.trace_id = np.full(capacity, -1, dtype=np.int32)
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self.capacities = np.zeros(0, dtype=np.int64)
+        self.versions = np.zeros(0, dtype=np.int64)
+        self.names = []
+        self.ids = dict()
+        self.ranges = dict()
+        self.end = 0
+
+    @classmethod
+    def from_columns(cls, time, value, trace_id, starts, lengths, names, ranges=None):
+        """
+        Wraps existing packed columns, such as memory-mapped file arrays, without copying.
+
+        The first append to a wrapped store copies the columns into memory.
+
+        Args:
+            time (np.ndarray): Time column, traces packed back to back.
+            value (np.ndarray): Value column aligned with time.
+            trace_id (np.ndarray): Trace id column aligned with time.
+            starts (np.ndarray): Start offset of each trace.
+            lengths (np.ndarray): Number of points of each trace.
+            names (list): Trace names.
+            ranges (list): Optional known (min, max) value range of each trace.
+
+        Returns:
+            TraceStore: The store.
+        """
+        store = cls()
+        store.time, store.value, store.trace_id = time, value, trace_id
+        store.starts = np.asarray(starts, dtype=np.int64)
+        store.lengths = np.asarray(lengths, dtype=np.int64)
+        store.capacities = store.lengths.copy()
+        store.versions = np.zeros(len(names), dtype=np.int64)
+        store.names = list(names)
+        store.ids = {name: tid for tid, name in enumerate(store.names)}
+        if ranges is not None:
+            store.ranges = {tid: (0, lo, hi) for tid, (lo, hi) in enumerate(ranges) if lo is not None}
+        store.end = len(time)
+        return store
+
+    @property
+    def nbytes(self):
+        """int: Bytes held by the column buffers."""
+        return self.time.nbytes + self.value.nbytes + self.trace_id.nbytes
+
+    def add_trace(self, name: str, time=None, value=None, capacity: int = 0):
+        """
+        Adds a trace segment and optionally fills it.
+
+        Args:
+            name (str): Unique trace name.
+            time (np.ndarray): Increasing event times.
+            value (np.ndarray): Values aligned with time.
+            capacity (int): Number of points to reserve for the trace.
+
+        Returns:
+            int: The id of the new trace.
+        """
+        if name in self.ids:
+            raise KeyError(f"trace {name!r} already exists")
+        n = 0 if time is None else len(time)
+        capacity = max(capacity, n)
+        tid = len(self.names)
+        self._reserve(self.end + capacity)
+
+        self.names.append(name)
+        self.ids[name] = tid
+        self.starts = np.append(self.starts, self.end)
+        self.lengths = np.append(self.lengths, 0)
+        self.capacities = np.append(self.capacities, capacity)
+        self.versions = np.append(self.versions, 0)
+        self.end += capacity
+
+        if n:
+            self.append(tid, time, value)
+        return tid
+
+    def append(self, tid: int, time, value):
+        """
+        Appends points to a trace, keeping its times sorted.
+
+        Chunks that arrive in order are copied to the end of the segment.
+        Unsorted chunks are sorted first, and chunks that start before the
+        last stored time are merged with the overlapping tail only.
+
+        Args:
+            tid (int): Trace id.
+            time (np.ndarray): Event times.
+            value (np.ndarray): Values aligned with time.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        value = np.asarray(value, dtype=np.float64)
+        if time.shape != value.shape:
+            raise ValueError("time and value must have the same length")
+        n = len(time)
+        if not n:
+            return
+        if n > 1 and (time[1:] < time[:-1]).any():
+            order = np.argsort(time, kind="stable")
+            time, value = time[order], value[order]
+
+        length = int(self.lengths[tid])
+        if length + n > self.capacities[tid]:
+            self._grow(tid, length + n)
+
+        start = int(self.starts[tid])
+        if length and time[0] < self.time[start+length-1]:
+            tail = start + int(np.searchsorted(self.times(tid), time[0], "right"))
+            time = np.concatenate((self.time[tail:start+length], time))
+            value = np.concatenate((self.value[tail:start+length], value))
+            order = np.argsort(time, kind="stable")
+            time, value = time[order], value[order]
+        else:
+            tail = start + length
+
+        self.time[tail:tail+len(time)] = time
+        self.value[tail:tail+len(time)] = value
+        self.trace_id[start+length:start+length+n] = tid
+        self.lengths[tid] += n
+        self.versions[tid] += 1
+
+    def times(self, tid: int):
+        """
+        Returns a view of a trace's event times.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: View into the time column.
+        """
+        start = self.starts[tid]
+        return self.time[start:start+self.lengths[tid]]
+
+    def values(self, tid: int):
+        """
+        Returns a view of a trace's values.
+
+        Args:
+            tid (int): Trace id.
+
+        Returns:
+            np.ndarray: View into the value column.
+        """
+        start = self.starts[tid]
+        return self.value[start:start+self.lengths[tid]]
+
+    def compact(self):
+        """Releases the spare capacity of every trace."""
+        self._relayout(self.lengths.copy(), int(self.lengths.sum()))
+
+    def _grow(self, tid, needed):
+        """
+        Gives a trace room for at least needed points.
+
+        Args:
+            tid (int): Trace id.
+            needed (int): Required capacity.
+        """
+        capacity = max(needed, 2 * int(self.capacities[tid]))
+        start = int(self.starts[tid])
+        size = len(self.time)
+        if start + self.capacities[tid] == self.end and start + capacity <= size:
+            self.end = start + capacity
+            self.capacities[tid] = capacity
+        elif self.end + capacity <= size:
+            self._move(tid, self.end, int(self.lengths[tid]))
+            self.starts[tid] = self.end
+            self.capacities[tid] = capacity
+            self.end += capacity
+        else:
+            capacities = self.capacities.copy()
+            capacities[tid] = capacity
+            self._relayout(capacities, 2 * int(capacities.sum()))
+
+    def _move(self, tid, dest, length):
+        """
+        Copies a trace segment to a new position inside the buffers.
+
+        Args:
+            tid (int): Trace id.
+            dest (int): New start offset.
+            length (int): Number of points to copy.
+        """
+        start = int(self.starts[tid])
+        self.time[dest:dest+length] = self.time[start:start+length]
+        self.value[dest:dest+length] = self.value[start:start+length]
+        self.trace_id[dest:dest+length] = tid
+        self.trace_id[start:start+self.capacities[tid]] = -1
+
+    def _reserve(self, size):
+        """
+        Makes sure the buffers hold at least size points.
+
+        Args:
+            size (int): Required buffer length.
+        """
+        if size <= len(self.time):
+            return
+        self._relayout(self.capacities.copy(), max(size, 2 * len(self.time)))
+
+    def _relayout(self, capacities, size):
+        """
+        Copies every segment, packed in trace order, into fresh buffers.
+
+        Args:
+            capacities (np.ndarray): New capacity of each trace.
+            size (int): Length of the new buffers.
+        """
+        size = max(size, int(capacities.sum()))
+        time = np.empty(size, dtype=np.float64)
+        value = np.empty(size, dtype=np.float64)
+        trace_id = np.full(size, -1, dtype=np.int32)
+
+        starts = np.zeros(len(capacities), dtype=np.int64)
+        if len(capacities):
+            starts[1:] = np.cumsum(capacities)[:-1]
+        for tid in range(len(capacities)):
+            old, new, n = int(self.starts[tid]), int(starts[tid]), int(self.lengths[tid])
+            time[new:new+n] = self.time[old:old+n]
+            value[new:new+n] = self.value[old:old+n]
+            trace_id[new:new+n] = tid
+
+        self.time, self.value, self.trace_id = time, value, trace_id
+        self.starts = starts
+        self.capacities = capacities
+        self.end = int(capacities.sum())
@@ -1,83 +1,344 @@
-import pyqtgraph
-from PyQt6.QtWidgets import QTableWidget, QAbstractItemView, QHeaderView, QPushButton
-from PyQt6.QtGui import QColor, QPixmap, QIcon
-from PyQt6.QtCore import QSize
+from PyQt6.QtWidgets import (QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QApplication, QMenu,
+                             QWidget, QLineEdit, QComboBox, QToolButton, QHBoxLayout, QVBoxLayout)
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import QAbstractListModel, QSortFilterProxyModel, QModelIndex, QSize, QRect, QTimer, Qt, pyqtSignal
 
-class ButtonTable(QTableWidget):
-    """A table widget for displaying buttons with colored icons and text."""
+from .trace_registry import registry
 
-    def __init__(self, columns: int, parent=None):
+
+class TraceModel(QAbstractListModel):
+    """
+    Every trace's name, color and visibility, as one checkable row each.
+
+    Visibility changes, single or in bulk, are reported once through
+    visibility_changed with the names of the traces shown and of the
+    traces hidden.
+    """
+
+    visibility_changed = pyqtSignal(list, list)
+
+    def __init__(self, parent=None):
         """
-        Initializes the ButtonTable.
+        Initializes the TraceModel.
+
+        Args:
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.names = []
+        self.colors = []
+        self.visible = []
+        self.rows = dict()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.names[row]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return registry.icon(self.colors[row])
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if self.visible[row] else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable
+
+    def add_trace(self, name, color):
+        """
+        Appends a visible trace.
+
+        Args:
+            name (str): Trace name.
+            color (str): Trace color.
+        """
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.append(name)
+        self.colors.append(color)
+        self.visible.append(True)
+        self.rows[name] = row
+        self.endInsertRows()
+
+    def clear(self):
+        """Removes every trace."""
+        self.beginResetModel()
+        self.names, self.colors, self.visible = [], [], []
+        self.rows = dict()
+        self.endResetModel()
+
+    def change_visible(self, shown, hidden):
+        """
+        Shows some traces and hides others as one change.
+
+        Args:
+            shown (list): Names of the traces to show.
+            hidden (list): Names of the traces to hide.
+        """
+        show = [self.rows[name] for name in shown if name in self.rows and not self.visible[self.rows[name]]]
+        hide = [self.rows[name] for name in hidden if name in self.rows and self.visible[self.rows[name]]]
+        rows = show + hide
+        if not rows:
+            return
+        for row in show:
+            self.visible[row] = True
+        for row in hide:
+            self.visible[row] = False
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [Qt.ItemDataRole.CheckStateRole])
+        self.visibility_changed.emit([self.names[row] for row in show], [self.names[row] for row in hide])
+
+    def set_visible(self, names, visible):
+        """
+        Shows or hides many traces at once.
+
+        Args:
+            names (list): Names of the traces.
+            visible (bool): True to show them.
+        """
+        if visible:
+            self.change_visible(names, [])
+        else:
+            self.change_visible([], names)
+
+    def solo(self, name):
+        """
+        Shows one trace and hides every other.
+
+        Args:
+            name (str): Name of the trace to keep.
+        """
+        self.change_visible([name], [n for n in self.names if n != name])
+
+
+class TraceFilter(QSortFilterProxyModel):
+    """Shows the traces whose name contains the search text, optionally only visible or hidden ones."""
+
+    def __init__(self, model: TraceModel, parent=None):
+        """
+        Initializes the TraceFilter.
+
+        Args:
+            model (TraceModel): The traces.
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.state = "all"
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setSourceModel(model)
+
+    def set_state(self, state):
+        """
+        Sets which traces pass by visibility.
+
+        Args:
+            state (str): "all", "visible" or "hidden".
+        """
+        if state != self.state:
+            self.state = state
+            self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.state != "all":
+            if self.sourceModel().visible[source_row] != (self.state == "visible"):
+                return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
+class TraceDelegate(QStyledItemDelegate):
+    """Paints a trace as its shared color icon and name, dimmed while hidden."""
+
+    def __init__(self, size=QSize(96, 24), parent=None):
+        """
+        Initializes the TraceDelegate.
+
+        Args:
+            size (QSize): Size of every cell.
+            parent: Parent object (optional).
+        """
+        super().__init__(parent)
+        self.size = size
+
+    def sizeHint(self, option, index):
+        return self.size
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        visible = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        palette = option.palette
+        painter.save()
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(rect, palette.midlight())
+        if not visible:
+            painter.fillRect(rect, palette.mid())
+        side = min(16, rect.height())
+        icon_rect = QRect(rect.left() + 4, rect.top() + (rect.height() - side) // 2, side, side)
+        index.data(Qt.ItemDataRole.DecorationRole).paint(painter, icon_rect,
+                                                        mode=QIcon.Mode.Normal if visible else QIcon.Mode.Disabled)
+        text_rect = rect.adjusted(side + 10, 0, 0, 0)
+        painter.setPen(palette.text().color() if visible else palette.placeholderText().color())
+        text = option.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+
+class TraceTable(QListView):
+    """
+    A wrapping grid of checkable traces painted by a delegate.
+
+    Clicking a trace toggles it, Alt+click shows only that trace, and the
+    context menu shows, hides or solos traces in bulk.
+    """
+
+    visibility_changed = pyqtSignal(list, list)
+
+    def __init__(self, parent=None):
+        """
+        Initializes the TraceTable.
 
         Args:
-            columns (int): Number of columns in the table.
             parent: Parent widget (optional).
         """
-        super().__init__(0, columns, parent)  # Start with 0 rows
-        self.setColumnCount(columns)
-        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
+        super().__init__(parent)
+        self.traces = TraceModel(self)
+        self.proxy = TraceFilter(self.traces, self)
+        self.setModel(self.proxy)
+        self.setItemDelegate(TraceDelegate(parent=self))
+        self.setViewMode(QListView.ViewMode.ListMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setMouseTracking(True)
         self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        # self.setFixedWidth(columns * (84+4))  # Fixed width, dynamic height
-        self.setIconSize(QSize(20, 20))
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.context_menu)
+        self.clicked.connect(self.trace_clicked)
+        self.traces.visibility_changed.connect(self.visibility_changed)
 
-    def add_button(self, color: str, text: str, vis):
+    def add_trace(self, name, color):
         """
-        Adds a button with a colored square icon and text to the table.
+        Adds a visible trace.
 
         Args:
-            color (str): Color of the button's icon.
-            text (str): Text displayed on the button.
-            vis: Callback function for button click events.
+            name (str): Trace name.
+            color (str): Trace color.
         """
-        current_row_count = self.rowCount()
-        current_col_count = self.columnCount()
+        self.traces.add_trace(name, color)
 
-        # Find the next empty cell
-        for row in range(current_row_count):
-            for col in range(current_col_count):
-                if self.cellWidget(row, col) is None:
-                    self._place_button(row, col, color, text, vis)
-                    return
+    def clear_traces(self):
+        """Removes every trace."""
+        self.traces.clear()
 
-        # If no empty cell was found, create a new row
-        self.insertRow(current_row_count)
-        self._place_button(current_row_count, 0, color, text,vis)
-
-    def _place_button(self, row: int, col: int, color: str, text: str, vis):
+    def is_visible(self, name):
         """
-        Places a button in the specified row and column.
+        Checks whether a trace is shown.
 
         Args:
-            row (int): Row index.
-            col (int): Column index.
-            color (str): Color of the button's icon.
-            text (str): Text displayed on the button.
-            vis: Callback function for button click events.
+            name (str): Trace name.
+
+        Returns:
+            bool: True when shown.
         """
-        button = QPushButton(text)
-        button.setIcon(self.create_color_icon(QColor(color)))
-        button.setIconSize(QSize(20, 20))
-        button.setCheckable(True)
-        button.clicked.connect(vis)
-        
-        self.setCellWidget(row, col, button)
-        
+        return self.traces.visible[self.traces.rows[name]]
 
-    def create_color_icon(self, color: str) -> QIcon:
+    def set_visible(self, names, visible):
         """
-        Creates a 20x20 square icon filled with the specified color.
+        Shows or hides many traces at once.
 
         Args:
-            color (str): Color of the icon.
+            names (list): Names of the traces.
+            visible (bool): True to show them.
+        """
+        self.traces.set_visible(names, visible)
+
+    def listed(self):
+        """
+        Gets the names of the traces passing the filter.
 
         Returns:
-            QIcon: The created icon.
+            list: Trace names.
+        """
+        return [self.proxy.index(row, 0).data() for row in range(self.proxy.rowCount())]
+
+    def set_filter(self, text="", state="all"):
+        """
+        Lists only the traces whose name contains a string.
+
+        Args:
+            text (str): Text to search for, case-insensitive.
+            state (str): "all", or only the "visible" or "hidden" traces.
+        """
+        self.proxy.set_state(state)
+        self.proxy.setFilterFixedString(text)
+
+    def trace_clicked(self, index):
+        name = index.data()
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.AltModifier:
+            self.traces.solo(name)
+        else:
+            self.traces.set_visible([name], not self.is_visible(name))
+
+    def context_menu(self, pos):
+        index = self.indexAt(pos)
+        menu = QMenu(self)
+        if index.isValid():
+            name = index.data()
+            menu.addAction(f"Solo {name}", lambda: self.traces.solo(name))
+            menu.addSeparator()
+        menu.addAction("Show Listed", lambda: self.set_visible(self.listed(), True))
+        menu.addAction("Hide Listed", lambda: self.set_visible(self.listed(), False))
+        menu.addAction("Show All", lambda: self.set_visible(self.traces.names, True))
+        menu.addAction("Hide All", lambda: self.set_visible(self.traces.names, False))
+        menu.exec(self.viewport().mapToGlobal(pos))
+
+
+class TracePanel(QWidget):
+    """The trace grid with a search box, a visibility filter and bulk show and hide."""
+
+    def __init__(self, table: TraceTable, parent=None):
         """
-        pixmap = QPixmap(20, 20)
-        pixmap.fill(color)
-        return QIcon(pixmap)
+        Initializes the TracePanel.
+
+        Args:
+            table (TraceTable): The traces.
+            parent: Parent widget (optional).
+        """
+        super().__init__(parent)
+        self.table = table
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Search traces")
+        self.search.setClearButtonEnabled(True)
+        self.state = QComboBox()
+        self.state.addItems(["All", "Visible", "Hidden"])
+        show = QToolButton()
+        show.setText("Show")
+        show.setToolTip("Show the listed traces")
+        show.clicked.connect(lambda: table.set_visible(table.listed(), True))
+        hide = QToolButton()
+        hide.setText("Hide")
+        hide.setToolTip("Hide the listed traces")
+        hide.clicked.connect(lambda: table.set_visible(table.listed(), False))
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(150)
+        self.timer.timeout.connect(self.apply_filter)
+        self.search.textChanged.connect(self.timer.start)
+        self.state.currentIndexChanged.connect(self.apply_filter)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.search)
+        controls.addWidget(self.state)
+        controls.addWidget(show)
+        controls.addWidget(hide)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(controls)
+        layout.addWidget(table)
 
-    # def on_button_click(self, row: int, col: int):
-    #     #print(f"Button clicked at Row: {row}, Column: {col}")
\ No newline at end of file
+    def apply_filter(self):
+        """Filters the traces by the search text and visibility."""
+        self.timer.stop()
+        self.table.set_filter(self.search.text(), self.state.currentText().lower())
@@ -0,0 +1,148 @@
+import threading
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals carrying job results from worker threads back to the GUI thread."""
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class Job(QRunnable):
+    """A function call run on a QThreadPool thread."""
+
+    def __init__(self, job_id: int, signals: WorkerSignals, fn, args, kargs):
+        """
+        Initializes the Job.
+
+        Args:
+            job_id (int): Id reported with the result.
+            signals (WorkerSignals): Signals to emit the result through.
+            fn: Function to call.
+            args (tuple): Positional arguments for fn.
+            kargs (dict): Keyword arguments for fn.
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.signals = signals
+        self.fn = fn
+        self.args = args
+        self.kargs = kargs
+        self.cancelled = threading.Event()
+
+    def run(self):
+        result = None
+        if not self.cancelled.is_set():
+            try:
+                result = self.fn(*self.args, **self.kargs)
+            except Exception:
+                self.signals.failed.emit(self.job_id, traceback.format_exc())
+                return
+        try:
+            self.signals.finished.emit(self.job_id, result)
+        except RuntimeError:
+            pass  # the pool was deleted while the job ran
+
+
+class WorkerPool(QObject):
+    """
+    Runs functions off the GUI thread and hands their results to callbacks on it.
+
+    Results arrive through queued signals, so callbacks run on the thread
+    that owns the pool. Jobs can be tagged with a key and every job of a key
+    cancelled at once: queued ones never start and the results of running
+    ones are dropped, which keeps stale work from reaching the view. Jobs
+    stay referenced until they report back, since Qt still runs them.
+    """
+
+    job_failed = pyqtSignal(str)
+
+    def __init__(self, max_threads: int = None):
+        """
+        Initializes the WorkerPool.
+
+        Args:
+            max_threads (int): Maximum number of worker threads, Qt's default when None.
+        """
+        super().__init__()
+        self.pool = QThreadPool(self)
+        if max_threads is not None:
+            self.pool.setMaxThreadCount(max_threads)
+        self.signals = WorkerSignals()
+        self.signals.finished.connect(self._finished)
+        self.signals.failed.connect(self._failed)
+        self.jobs = dict()
+        self.next_id = 0
+
+    def submit(self, fn, *args, key=None, callback=None, **kargs):
+        """
+        Queues a function call.
+
+        Args:
+            fn: Function to call on a worker thread.
+            *args: Positional arguments for fn.
+            key: Optional tag used to cancel the job.
+            callback: Called on the GUI thread with the result.
+            **kargs: Keyword arguments for fn.
+
+        Returns:
+            int: The job id.
+        """
+        job_id = self.next_id
+        self.next_id += 1
+        job = Job(job_id, self.signals, fn, args, kargs)
+        self.jobs[job_id] = (job, key, callback)
+        self.pool.start(job)
+        return job_id
+
+    def cancel(self, key):
+        """
+        Cancels every pending job with a key.
+
+        Args:
+            key: Tag given to submit.
+        """
+        for job_id, (job, k, _) in list(self.jobs.items()):
+            if k == key and not job.cancelled.is_set():
+                job.cancelled.set()
+                if self.pool.tryTake(job):
+                    del self.jobs[job_id]
+
+    def pending(self, key=None):
+        """
+        Counts the jobs not yet delivered.
+
+        Args:
+            key: Only count jobs with this tag, all jobs when None.
+
+        Returns:
+            int: Number of pending jobs.
+        """
+        return sum(1 for job, k, _ in self.jobs.values()
+                   if not job.cancelled.is_set() and (key is None or k == key))
+
+    def wait(self, msecs: int = -1):
+        """
+        Blocks until the running jobs finish, for scripts and shutdown.
+
+        Args:
+            msecs (int): Timeout in milliseconds, -1 waits forever.
+
+        Returns:
+            bool: True when every job finished.
+        """
+        return self.pool.waitForDone(msecs)
+
+    def _finished(self, job_id, result):
+        entry = self.jobs.pop(job_id, None)
+        if entry is None or entry[0].cancelled.is_set():
+            return
+        if entry[2] is not None:
+            entry[2](result)
+
+    def _failed(self, job_id, message):
+        if self.jobs.pop(job_id, None) is not None:
+            self.job_failed.emit(message)